@@ -5,12 +5,17 @@ from flask_migrate import Migrate
 from flask_login import LoginManager
 
 from app.endpoints.namespaces import api_bp
+from app.cache import film_cache
+from app.crud import init_list_modes, init_record_caches
 from app.config import Config
+from app.pool import init_engine_options
+from app.models.routing import init_replicas
 from app import models, endpoints
 from app.models.db_init import db
 from app.commands import cmd
 from app.auth import auth
 from app.models import User
+from app.principal import init_role_cache, load_principal, load_token_principal, token_auth
 
 
 MIGRATE = Migrate()
@@ -21,7 +26,14 @@ def create_app(conf=Config):
     app = Flask(__name__)
     app.config.from_object(conf)
 
+    init_engine_options(app)
+    init_replicas(app)
     db.init_app(app)
+    film_cache.init_app(app)
+    init_record_caches(app)
+    init_list_modes(app)
+    init_role_cache(app)
+    token_auth.init_app(app)
     app.register_blueprint(cmd, cli_group=None)
     app.register_blueprint(api_bp, url_prefix='/api')
     MIGRATE.init_app(app, db)
@@ -30,8 +42,7 @@ def create_app(conf=Config):
     login_manager.login_view = 'api.authentication_login'
     login_manager.init_app(app)
 
-    @login_manager.user_loader
-    def load_user(user_id):
-        return User.query.get(int(user_id))
+    login_manager.user_loader(load_principal)
+    login_manager.request_loader(load_token_principal)
 
     return app
@@ -1,17 +1,21 @@
 """Module with authentication"""
 
-from flask import request, flash
+from flask import request, flash, session
 from werkzeug.security import check_password_hash
 from flask_restx import Resource, fields
 from flask_login import login_user, login_required, logout_user, current_user
 
 from app.models import User
+from app.principal import PRINCIPAL_KEY, make_principal, request_token, store_principal, \
+    token_auth
 from app.endpoints.namespaces import auth_ns as auth
 
 
 auth_model = auth.model('Authentication', {
     'email': fields.String(description='User email', example='john@gmail.com'),
-    'password': fields.String(description='User password', example='Johny5863')
+    'password': fields.String(description='User password', example='Johny5863'),
+    'token': fields.Boolean(description='Return a signed bearer token instead '
+                                        'of starting a session', example=False)
 })
 
 
@@ -41,7 +45,13 @@ class Login(Resource):
                 auth.logger.warning('Wrong password entered.')
                 auth.abort(400, 'WRONG PASSWORD!')
 
-            login_user(user)
+            if request.json.get('token') is True:
+                token = token_auth.issue(make_principal(user))
+                auth.logger.info('%s successfully received a token.', user.name)
+                return {'token': token, 'token_type': 'Bearer',
+                        'expires_in': int(token_auth.ttl)}, 200
+
+            login_user(store_principal(user))
             auth.logger.info('%s successfully login.', current_user.name)
             return 'OK', 200
 
@@ -61,7 +71,11 @@ class Logout(Resource):
         """Logout method"""
         try:
             user = current_user.name
+            token = request_token()
+            if token is not None:
+                token_auth.revoke(token)
             logout_user()
+            session.pop(PRINCIPAL_KEY, None)
             auth.logger.info('%s successfully logout.', user)
             return 'SUCCESSFULLY LOGOUT', 200
 
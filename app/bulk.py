@@ -0,0 +1,135 @@
+"""Module with bulk import and export of films in NDJSON and CSV formats"""
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+import orjson
+
+from app.crud import film
+from loggers import logger
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+IMPORT_MIMETYPES = {'application/x-ndjson': 'ndjson', 'text/csv': 'csv'}
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+EXPORT_MIMETYPES = {format_: mimetype for mimetype, format_ in IMPORT_MIMETYPES.items()}
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FIELDS = ('film_id', 'user_id', 'title', 'poster', 'description', 'release_date',
+                 'rating', 'directors', 'genres')
+
+INVALID_ENCODING = "The file is not valid UTF-8, the rest of it was not imported."
+
+Row = Tuple[int, Union[Dict[str, Any], str]]
+
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[Row]:
+    """
+    Function yielding line numbers with films or error messages of a NDJSON file,
+    a decoding error ends the file with an error after the last decoded line
+    """
+    number = 0
+    try:
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield number, "Invalid JSON."
+                continue
+            if isinstance(record, dict):
+                yield number, record
+            else:
+                yield number, "A row must be a JSON object."
+    except UnicodeDecodeError:
+        yield number + 1, INVALID_ENCODING
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[Row]:
+    """
+    Function yielding line numbers with films of a CSV file with a header,
+    a decoding error ends the file with an error after the last decoded line
+    """
+    reader = csv.DictReader(lines)
+    try:
+        for record in reader:
+            yield reader.line_num, record
+    except UnicodeDecodeError:
+        yield reader.line_num + 1, INVALID_ENCODING
+
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+def import_films(lines: Iterable[str], file_format: str, user_id: int,
+                 batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Function importing films in batches of batch_size rows on behalf of the user.
+    Invalid rows are skipped, the report contains the numbers of imported and failed rows
+    and the first MAX_REPORTED_ERRORS errors with their line numbers
+    """
+    if file_format not in READERS:
+        raise ValueError(f"Unknown import format {file_format}!")
+    report = {'imported': 0, 'failed': 0, 'errors': []}
+
+    def add_error(number: int, message: str):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': number, 'error': message})
+
+    def save(batch: List[Tuple[int, Dict[str, Any]]]):
+        errors = film.bulk_create([record for _, record in batch], user_id=user_id)
+        report['imported'] += len(batch) - len(errors)
+        for index, message in sorted(errors.items()):
+            add_error(batch[index][0], message)
+        logger.info('Imported a batch of %d films, %d rows failed.',
+                    len(batch) - len(errors), len(errors))
+
+    batch = []
+    for number, record in READERS[file_format](lines):
+        if isinstance(record, str):
+            add_error(number, record)
+            continue
+        batch.append((number, record))
+        if len(batch) >= batch_size:
+            save(batch)
+            batch = []
+    if batch:
+        save(batch)
+    return report
+
+
+def write_ndjson(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[str]:
+    """Function yielding NDJSON lines of the films, one chunk per batch"""
+    for batch in batches:
+        yield ''.join(orjson.dumps(record).decode() + '\n' for record in batch)
+
+
+def write_csv(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[str]:
+    """Function yielding CSV rows of the films with a header, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows({**record, 'directors': '&'.join(map(str, record['directors'])),
+                          'genres': '&'.join(map(str, record['genres']))} for record in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+WRITERS = {'ndjson': write_ndjson, 'csv': write_csv}
+
+
+def export_films(file_format: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """
+    Function yielding the whole film catalogue in the import format chunk by chunk,
+    directors and genres are given by ids
+    """
+    if file_format not in WRITERS:
+        raise ValueError(f"Unknown export format {file_format}!")
+    return WRITERS[file_format](film.export_batches(batch_size=batch_size))
@@ -0,0 +1,252 @@
+"""Module with the response cache of read-only endpoints"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+from flask import Response, request
+
+CACHED_HEADERS = ('X-Next-Cursor',)
+
+
+class CacheBackend(ABC):
+    """Abstract storage of cached values, json_values backends only keep JSON values"""
+    json_values: bool = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Method returning a cached value or None"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any):
+        """Method storing a value"""
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1) -> int:
+        """Method incrementing a counter and returning its new value"""
+
+    @abstractmethod
+    def counter(self, key: str) -> int:
+        """Method returning a counter without creating it, missing counters are 0"""
+
+
+class LRUCache(CacheBackend):
+    """In-process cache with bounded size and time to live of the values"""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.items: OrderedDict = OrderedDict()
+        self.counters: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Method returning a cached value or None if it is missing or expired"""
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        """Method storing a value and evicting the least recently used ones"""
+        with self.lock:
+            self.items[key] = (value, time.monotonic() + self.ttl)
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        """Method incrementing a counter, counters are never evicted"""
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+            return self.counters[key]
+
+    def counter(self, key: str) -> int:
+        """Method returning a counter, only incremented counters are stored"""
+        with self.lock:
+            return self.counters.get(key, 0)
+
+
+class LocalSharedClient:
+    """In-process stand-in for a shared key-value store client (subset of the redis API)"""
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[bytes]:
+        """Method returning a stored value or None"""
+        with self.lock:
+            value, expires = self.values.get(name, (None, None))
+            if expires is not None and expires < time.monotonic():
+                del self.values[name]
+                return None
+            return value
+
+    def set(self, name: str, value: Any, ex: Optional[float] = None):
+        """Method storing a value expiring after ex seconds"""
+        with self.lock:
+            data = value if isinstance(value, bytes) else str(value).encode()
+            self.values[name] = (data, None if ex is None else time.monotonic() + ex)
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        """Method incrementing a counter and returning its new value"""
+        with self.lock:
+            value, _ = self.values.get(name, (b'0', None))
+            value = int(value) + amount
+            self.values[name] = (str(value).encode(), None)
+            return value
+
+
+class SharedCache(CacheBackend):
+    """Cache kept in a shared key-value store, values are serialised to JSON"""
+    json_values = True
+
+    def __init__(self, client, ttl: float = 60, prefix: str = 'cache:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        """Method returning a cached value or None"""
+        value = self.client.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key: str, value: Any):
+        """Method storing a value for ttl seconds"""
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        """Method incrementing a counter and returning its new value"""
+        return int(self.client.incr(self.prefix + key, amount))
+
+    def counter(self, key: str) -> int:
+        """Method returning a counter without storing it"""
+        value = self.client.get(self.prefix + key)
+        return 0 if value is None else int(value)
+
+
+def shared_client(url: Optional[str]):
+    """
+    Function returning a redis client for the url or the in-process stand-in without it.
+    A configured url needs the redis package, falling back to the stand-in would
+    silently give every worker its own store
+    """
+    if not url:
+        return LocalSharedClient()
+    try:
+        import redis  # pylint: disable=import-outside-toplevel
+    except ImportError as error:
+        raise RuntimeError("The redis package is required for the shared store!") from error
+    return redis.Redis.from_url(url)
+
+
+def cache_backend(app, name: str, ttl: float) -> Optional[CacheBackend]:
+    """
+    Function creating the backend selected by the {name}_BACKEND app config:
+    `local` (per worker, with {name}_SIZE and {name}_TTL), `shared` (in the store
+    of {name}_URL, seen by all workers) or `none`
+    """
+    kind = app.config.get(f'{name}_BACKEND', 'local')
+    ttl = float(app.config.get(f'{name}_TTL', ttl))
+    if kind == 'local':
+        size = int(app.config.get(f'{name}_SIZE', 1024))
+        return LRUCache(size, ttl) if size > 0 else None
+    if kind == 'shared':
+        return SharedCache(shared_client(app.config.get(f'{name}_URL')), ttl)
+    if kind == 'none':
+        return None
+    raise ValueError(f"Unknown {name.lower().replace('_', ' ')} backend {kind}!")
+
+
+class ResponseCache:
+    """
+    Cache of successful JSON responses keyed on the route and the query arguments.
+    Keys contain a version number, so invalidation only increments the version
+    and works the same way for the in-process and the shared backends.
+    With read replicas, responses are not cached for REPLICA_STICKY_SECONDS
+    after an invalidation, they may be read from a replica lagging behind the write
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.backend: Optional[CacheBackend] = None
+        self.hits = 0
+        self.misses = 0
+        self.replica_lag = 0.0
+        self.written = 0.0
+
+    def init_app(self, app):
+        """Method for creating the backend selected by the application config"""
+        self.backend = cache_backend(app, 'RESPONSE_CACHE', 60)
+        self.hits = 0
+        self.misses = 0
+        self.replica_lag = float(app.config.get('REPLICA_STICKY_SECONDS', 5)) \
+            if app.config.get('REPLICA_DATABASE_URIS') else 0.0
+        self.written = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Method returning the cache counters for monitoring"""
+        return {'enabled': self.backend is not None, 'hits': self.hits, 'misses': self.misses}
+
+    def version(self) -> int:
+        """Method returning the current version of the cached responses"""
+        return self.backend.counter(f'{self.name}:version')
+
+    def invalidate(self):
+        """Method making all the cached responses stale"""
+        if self.backend is not None:
+            self.backend.incr(f'{self.name}:version')
+            if self.replica_lag > 0:
+                self.written = time.time()
+                self.backend.set(f'{self.name}:written', self.written)
+
+    def replicas_behind(self) -> bool:
+        """Method checking whether the replicas may not have the last write yet"""
+        if self.replica_lag <= 0:
+            return False
+        written = max(self.written, float(self.backend.get(f'{self.name}:written') or 0))
+        return time.time() - written < self.replica_lag
+
+    def key(self) -> str:
+        """Method returning the cache key of the current request"""
+        args = urlencode(sorted(request.args.items(multi=True)))
+        return f'{self.name}:{self.version()}:{request.path}?{args}'
+
+    def cached(self, func):
+        """Decorator caching responses of a resource method"""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if self.backend is None:
+                return func(*args, **kwargs)
+
+            key = self.key()
+            hit = self.backend.get(key)
+            if hit is not None:
+                self.hits += 1
+                body, headers = hit
+                return Response(body, status=200, mimetype='application/json', headers=headers)
+
+            self.misses += 1
+            response = func(*args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200 \
+                    and not self.replicas_behind():
+                headers = {name: response.headers[name] for name in CACHED_HEADERS
+                           if name in response.headers}
+                self.backend.set(key, [response.get_data(as_text=True), headers])
+            return response
+        return wrapper
+
+
+film_cache = ResponseCache('films')
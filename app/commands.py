@@ -1,14 +1,31 @@
 """Module for cli commands"""
 
+import random
+import re
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List
+
+import click
 from faker import Faker
 from flask import Blueprint
+from sqlalchemy import func
+from werkzeug.security import generate_password_hash
+from .bulk import EXPORT_BATCH_SIZE, IMPORT_BATCH_SIZE, IMPORT_FORMATS, export_films, \
+    import_films
 from .crud import director, film, genre, user
-from .models import Role
+from .models import Director, Film, Genre, Role, User, film_director, film_genre
 from .models.db_init import db
 
 cmd = Blueprint('cmd', __name__, cli_group=None)
 fake = Faker()
 
+SEED_BATCH_SIZE = 10000
+SEED_PASSWORD = 'Password1'
+SEED_POOL_SIZE = 1000
+# names and surnames accepted by the user and director schemas, bulk inserts skip validation
+SEED_NAME_PATTERN = re.compile(r'^[A-Z][a-z]*$')
+
 
 def seed_director():
     """Method for seeding director table"""
@@ -60,11 +77,129 @@ def seed_film():
         )
 
 
+def seed_pools() -> Dict[str, List[str]]:
+    """Method generating pools of fake values sampled by the bulk seeding"""
+    return {
+        'names': list({name for name in (fake.first_name() for _ in range(SEED_POOL_SIZE))
+                       if SEED_NAME_PATTERN.match(name) and len(name) <= 50}),
+        'surnames': list({name for name in (fake.last_name() for _ in range(SEED_POOL_SIZE))
+                          if SEED_NAME_PATTERN.match(name) and len(name) <= 50}),
+        'words': list({word for word in fake.words(SEED_POOL_SIZE)
+                       if word.isalpha() and word.islower() and len(word) <= 12}),
+        'texts': [fake.text() for _ in range(SEED_POOL_SIZE // 10)]
+    }
+
+
+def bulk_seed_table(model, number: int, make_row: Callable[[int], Dict[str, Any]],
+                    batch_size: int, after_batch: Callable[[List[int]], None] = None) -> List[int]:
+    """
+    Method inserting generated rows in batches with bulk_insert_mappings, one commit per batch.
+    make_row gets a number unique in the table, returns ids of the inserted rows
+    """
+    primary_key = getattr(model, model.__mapper__.primary_key[0].key)
+    last_id = db.session.query(func.coalesce(func.max(primary_key), 0)).scalar()
+    started = time.monotonic()
+    ids = []
+    for offset in range(0, number, batch_size):
+        db.session.bulk_insert_mappings(model, [
+            make_row(last_id + index)
+            for index in range(offset + 1, min(offset + batch_size, number) + 1)])
+        batch_ids = [record_id for (record_id,) in db.session.query(primary_key)
+                     .filter(primary_key > (ids[-1] if ids else last_id)).order_by(primary_key)]
+        if after_batch is not None:
+            after_batch(batch_ids)
+        db.session.commit()
+        ids.extend(batch_ids)
+    click.echo(f"Seeded {number} rows of {model.__tablename__} table "
+               f"in {time.monotonic() - started:.1f} s.")
+    return ids
+
+
+def bulk_seed(films: int, batch_size: int):
+    """
+    Method for seeding all tables with bulk inserts of generated batches.
+    The numbers of users and directors grow with the number of films,
+    all users get the SEED_PASSWORD password hashed once
+    """
+    pools = seed_pools()
+    seed_role()
+    roles = [role_id for (role_id,) in db.session.query(Role.role_id)]
+    password = generate_password_hash(SEED_PASSWORD, method='sha256')
+    users = bulk_seed_table(User, max(100, films // 100), lambda index: {
+        'role_id': random.choice(roles), 'name': random.choice(pools['names']),
+        'email': f'user{index}@example.com', 'password': password
+    }, batch_size)
+    directors = bulk_seed_table(Director, max(100, films // 20), lambda index: {
+        'name': random.choice(pools['names']), 'surname': random.choice(pools['surnames'])
+    }, batch_size)
+    seed_genre()
+    genres = [genre_id for (genre_id,) in db.session.query(Genre.genre_id)]
+
+    first_day, today = date(1950, 1, 1).toordinal(), date.today().toordinal()
+
+    def link_films(film_ids: List[int]):
+        for table, column, ids in ((film_director, 'director_id', directors),
+                                   (film_genre, 'genre_id', genres)):
+            db.session.execute(table.insert(), [
+                {'film_id': film_id, column: record_id} for film_id in film_ids
+                for record_id in random.sample(ids, random.randint(1, min(3, len(ids))))])
+
+    bulk_seed_table(Film, films, lambda index: {
+        'user_id': random.choice(users),
+        'title': ' '.join(random.sample(pools['words'], 2)).capitalize() + f' {index}',
+        'poster': f'https://www.posters.net/{index}', 'description': random.choice(pools['texts']),
+        'release_date': date.fromordinal(random.randint(first_day, today)),
+        'rating': round(random.uniform(0, 10), 1)
+    }, batch_size, after_batch=link_films)
+    click.echo(f"Seeded users can log in with the {SEED_PASSWORD} password.")
+
+
 @cmd.cli.command('seed_all')
-def seed_all():
+@click.option('--films', type=click.IntRange(min=1), default=None,
+              help='Number of films seeded with bulk inserts, numbers of users and directors '
+                   'are scaled with it. By default 100 films are created one by one')
+@click.option('--batch-size', type=click.IntRange(min=1), default=SEED_BATCH_SIZE,
+              help='Number of rows inserted with one commit in the bulk mode')
+def seed_all(films, batch_size):
     """Method for seeding all tables"""
+    if films is not None:
+        bulk_seed(films, batch_size)
+        return
     seed_role()
     seed_user()
     seed_director()
     seed_genre()
     seed_film()
+
+
+@cmd.cli.command('import_films')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user-id', type=int, required=True, help='Id of the user adding the films')
+@click.option('--format', 'file_format', type=click.Choice(IMPORT_FORMATS), default=None,
+              help='File format, by default it is taken from the file extension')
+@click.option('--batch-size', type=click.IntRange(min=1), default=IMPORT_BATCH_SIZE,
+              help='Number of rows saved with one commit')
+def import_films_command(path, user_id, file_format, batch_size):
+    """Method for importing films from a NDJSON or CSV file"""
+    if User.query.get(user_id) is None:
+        raise click.BadParameter(f"User with id {user_id} doesn't exist.", param_hint='--user-id')
+    if file_format is None:
+        file_format = 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+    with open(path, encoding='utf-8', newline='') as file:
+        report = import_films(file, file_format, user_id=user_id, batch_size=batch_size)
+    for error in report['errors']:
+        click.echo(f"Line {error['line']}: {error['error']}", err=True)
+    click.echo(f"Imported {report['imported']} films, {report['failed']} rows failed.")
+
+
+@cmd.cli.command('export_films')
+@click.argument('output', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--format', 'file_format', type=click.Choice(IMPORT_FORMATS), default='ndjson',
+              help='File format')
+@click.option('--batch-size', type=click.IntRange(min=1), default=EXPORT_BATCH_SIZE,
+              help='Number of rows fetched from the server-side cursor at once')
+def export_films_command(output, file_format, batch_size):
+    """Method for exporting all films to a NDJSON or CSV file (stdout by default)"""
+    for chunk in export_films(file_format, batch_size=batch_size):
+        output.write(chunk)
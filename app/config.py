@@ -6,5 +6,38 @@ import os
 class Config:
     """Configuration class"""
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
-    SQLALCHEMY_TRACK_MODIFICATIONS = True
+    REPLICA_DATABASE_URIS = [uri for uri in os.getenv("REPLICA_DATABASE_URLS", "").split(",")
+                             if uri]
+    REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_STATS_INTERVAL = float(os.getenv("DB_POOL_STATS_INTERVAL", "60"))
+    DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "0"))
     SECRET_KEY = os.getenv("APP_SECRET_KEY")
+    # seconds a session keeps the cached role of its user, without TOKEN_REVOCATION_URL
+    # an update or deletion of the user made by another worker is seen after this time
+    PRINCIPAL_TTL = float(os.getenv("PRINCIPAL_TTL", "300"))
+    ROLE_CACHE_TTL = float(os.getenv("ROLE_CACHE_TTL", "300"))
+    # seconds a token is valid, without TOKEN_REVOCATION_URL a token logged out or
+    # of a user changed in another worker or before a restart stays valid this long
+    TOKEN_TTL = float(os.getenv("TOKEN_TTL", "3600"))
+    # redis url shared by all workers for the revoked tokens and the user changes
+    TOKEN_REVOCATION_URL = os.getenv("TOKEN_REVOCATION_URL")
+    # a local response cache is per worker, the other workers return film lists
+    # for up to RESPONSE_CACHE_TTL seconds after a change, use `shared` or `none`
+    # with more than one worker
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "local")
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+    RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL")
+    # a local record cache is per worker, the other workers return a changed
+    # record for up to RECORD_CACHE_TTL seconds, `shared` keeps it in RECORD_CACHE_URL
+    RECORD_CACHE_BACKEND = os.getenv("RECORD_CACHE_BACKEND", "local")
+    RECORD_CACHE_SIZE = int(os.getenv("RECORD_CACHE_SIZE", "1024"))
+    RECORD_CACHE_TTL = float(os.getenv("RECORD_CACHE_TTL", "5"))
+    RECORD_CACHE_URL = os.getenv("RECORD_CACHE_URL")
+    FILM_LIST_MODE = os.getenv("FILM_LIST_MODE", "orm")
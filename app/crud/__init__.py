@@ -1,6 +1,24 @@
 """CRUD module __init__"""
 
+from app.cache import cache_backend
 from .director import director
 from .film import film
 from .genre import genre
 from .user import user
+
+
+def init_record_caches(app):
+    """
+    Function creating the record caches of rarely changed tables from the app config,
+    a local cache is invalidated only in the worker that changed the record
+    """
+    for crud in (director, genre, user):
+        crud.cache.reset(cache_backend(app, 'RECORD_CACHE', 5))
+
+
+def init_list_modes(app):
+    """Function selecting the query used for film lists from the app config"""
+    list_mode = app.config.get('FILM_LIST_MODE', 'orm')
+    if list_mode not in ('orm', 'aggregate'):
+        raise ValueError(f"Unknown film list mode {list_mode}!")
+    film.list_mode = list_mode
@@ -1,7 +1,7 @@
 """Module with abstract CRUD realisation"""
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 
 class CRUDAbstract(ABC):
@@ -13,10 +13,22 @@ class CRUDAbstract(ABC):
     def get(self, record_id: int):
         """Method to read one record by id"""
 
+    @abstractmethod
+    def get_many(self, ids: List[int]):
+        """Method to read records by ids in the order of the ids"""
+
     @abstractmethod
     def get_multi(self, *, page: int = 1, per_page: int = 10):
         """Method to read all records from a table with default pagination set to 10"""
 
+    @abstractmethod
+    def get_multi_keyset(self, *, cursor: Optional[str] = None, per_page: int = 10):
+        """Method to read records from a table page by page using an opaque cursor"""
+
+    @abstractmethod
+    def count(self, *, approximate: bool = False):
+        """Method returning the number of records in a table"""
+
     @abstractmethod
     def create(self, obj_in: Dict[str, Any], **kwargs):
         """Method to create one record"""
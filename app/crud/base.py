@@ -1,11 +1,19 @@
 """Module with base CRUD realisation"""
 
-from typing import Any, Dict, Generic, Optional, Union, Type, TypeVar
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, Union, Type, TypeVar
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import func, text
+from sqlalchemy.orm import joinedload, load_only, selectinload
 
+from app.cache import CacheBackend
 from app.models.db_init import db
+from app.models.routing import replica_reads
+from app.schemas.serializer import serialize_rows
 from .abstract import CRUDAbstract
+from .pagination import SortKeys, keyset_paginate, offset_paginate
 
 ModelType = TypeVar("ModelType", bound=db.Model)
 BaseSchemaType = TypeVar("BaseSchemaType", bound=BaseModel)
@@ -13,6 +21,57 @@ ListSchemaType = TypeVar("ListSchemaType", bound=BaseModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+LOAD_STRATEGIES = {
+    'select': None,
+    'selectin': selectinload,
+    'joined': joinedload
+}
+
+COUNT_CACHE_TTL = 60
+
+
+def replica_read(method):
+    """Decorator running a read-only CRUD method on a database replica"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with replica_reads(self.database):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class MissingRecordsError(ValueError):
+    """Error raised when some of the referenced records do not exist"""
+
+
+class CRUDCache:
+    """
+    Cached state of a CRUD class: the optional backend of the records read by id
+    with its hit and miss counters, the cached table counts and the change listeners
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.counts: Dict[bool, Tuple[int, float]] = {}
+        self.listeners: List[Callable[[], None]] = []
+
+    def reset(self, backend: Optional[CacheBackend]):
+        """Method replacing the record cache backend and clearing its counters"""
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Method returning the record cache counters for monitoring"""
+        return {'enabled': self.backend is not None, 'hits': self.hits, 'misses': self.misses}
+
+    def changed(self):
+        """Method clearing the cached counts and notifying the listeners after a commit"""
+        self.counts.clear()
+        for listener in self.listeners:
+            listener()
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType], CRUDAbstract):
     """
@@ -23,33 +82,223 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType], CRUDAbstr
     * `update_schema`: A Pydantic update model (schema) class
     * `list_schema`: A list of Pydantic models
     * `database`: SQLAlchemy session
+    * `relationships`: Names of the relationships returned by the schema
+    * `load_strategy`: Loading strategy for the relationships in multy queries:
+      `select` (lazy), `selectin` or `joined`
+    * `record_cache`: Optional cache backend of the records read by id
+    * `projection`: Load only the columns returned by the schema in multy queries
+
+    Callables appended to `cache.listeners` are called after every committed change.
     """
+    # The schemas, the session and the loading options are read by every method,
+    # and the class is the single entry point of the operations on a table
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods
 
     def __init__(self, model: Type[ModelType], schema: Type[BaseSchemaType],
                  update_schema: Type[UpdateSchemaType], list_schema: Type[ListSchemaType],
-                 database=db.session):
+                 *, database=db.session, relationships: Tuple[str, ...] = (),
+                 load_strategy: str = 'selectin', record_cache: Optional[CacheBackend] = None,
+                 projection: bool = False):
+        if load_strategy not in LOAD_STRATEGIES:
+            raise ValueError(f"Unknown load strategy {load_strategy}!")
         self.model = model
         self.schema = schema
         self.list_schema = list_schema
         self.update_schema = update_schema
         self.database = database
+        self.relationships = relationships
+        self.load_strategy = load_strategy
+        self.projection = projection
+        self.cache = CRUDCache(record_cache)
 
     def get(self, record_id: int) -> Optional[BaseSchemaType]:
-        """Method to read one record by id"""
-        return self.schema.from_orm(self.database.query(self.model).get(record_id))
+        """Method to read one record by id, through the record cache if it is set"""
+        if self.cache.backend is None:
+            return self.schema.from_orm(self.database.query(self.model).get(record_id))
+
+        key = self.record_key(record_id)
+        record = self.cache.backend.get(key)
+        if record is not None:
+            self.cache.hits += 1
+            return self.schema.parse_obj(record) if self.cache.backend.json_values else record
+
+        self.cache.misses += 1
+        record = self.schema.from_orm(self.database.query(self.model).get(record_id))
+        self.cache.backend.set(key, jsonable_encoder(record)
+                               if self.cache.backend.json_values else record)
+        return record
+
+    def record_key(self, record_id: int) -> str:
+        """
+        Method returning the record cache key containing the record version.
+        The version is read before the record, so a value loaded before
+        an invalidation is stored under an outdated key and never returned.
+        Reading does not create the version, only invalidated records keep a counter
+        """
+        name = f'{self.model.__tablename__}:{record_id}'
+        return f'{name}:{self.cache.backend.counter(f"{name}:version")}'
+
+    def invalidate_record(self, record_id: int):
+        """Method making the cached record stale"""
+        if self.cache.backend is not None:
+            self.cache.backend.incr(f'{self.model.__tablename__}:{record_id}:version')
+
+    @staticmethod
+    def schema_columns(model: Type[ModelType], schema: Type[BaseModel]) -> list:
+        """Method returning the model columns returned by the schema"""
+        return [getattr(model, column.key) for column in model.__mapper__.column_attrs
+                if column.key in schema.__fields__]
+
+    def loader_options(self) -> list:
+        """
+        Method returning loader options for eager loading of the relationships
+        and, in the projection mode, for loading only the columns used by the schema
+        """
+        options = []
+        if self.projection:
+            options.append(load_only(*self.schema_columns(self.model, self.schema)))
+
+        loader = LOAD_STRATEGIES[self.load_strategy]
+        if loader is None:
+            return options
+        for name in self.relationships:
+            option = loader(getattr(self.model, name))
+            if self.projection:
+                option = option.load_only(*self.schema_columns(
+                    getattr(self.model, name).property.mapper.class_,
+                    self.schema.__fields__[name].type_))
+            options.append(option)
+        return options
+
+    def multy_query(self):
+        """Method for creating multy queries with eager loaded relationships"""
+        return self.database.query(self.model).options(*self.loader_options())
+
+    def query_paginate(self, query, page: int = 1, per_page: int = 10) -> list:
+        """Method for pagination multy queries without counting all the records"""
+        items, _ = offset_paginate(query, page=page, per_page=per_page)
+        return items
+
+    def serialize(self, items: List[ModelType]) -> ListSchemaType:
+        """Method building the list schema from database records without re-validating them"""
+        return serialize_rows(self.list_schema, self.schema, items)
+
+    def rows_query(self, query):
+        """Method turning a multy query into the query of the rows passed to serialize"""
+        return query
+
+    @replica_read
+    def paginate_multi(self, query, page: int = 1, per_page: int = 10) -> ListSchemaType:
+        """Method for offset pagination of multy queries"""
+        return self.serialize(self.query_paginate(self.rows_query(query),
+                                                  page=page, per_page=per_page))
 
     def get_multi(self, *, page: int = 1, per_page: int = 10) -> ListSchemaType:
         """Method to read all records from a table with default pagination set to 10"""
-        return self.list_schema.from_orm(
-            [self.schema.from_orm(item) for item in self.database.query(self.model).paginate(
-                page=page, per_page=per_page).items])
+        return self.paginate_multi(self.multy_query().order_by(self.primary_key().asc()),
+                                   page=page, per_page=per_page)
+
+    @replica_read
+    def get_many(self, ids: List[int]) -> Tuple[ListSchemaType, List[int]]:
+        """
+        Method to read records by ids with one IN query and eager loaded relationships.
+        Records are returned in the order of the ids without duplicates,
+        together with the ids of missing records
+        """
+        ids = list(dict.fromkeys(ids))
+        primary_key = self.primary_key()
+        records = {getattr(item, primary_key.key): item for item in self.rows_query(
+            self.multy_query().filter(primary_key.in_(ids)))} if ids else {}
+        return self.serialize([records[record_id] for record_id in ids if record_id in records]), \
+            [record_id for record_id in ids if record_id not in records]
+
+    @replica_read
+    def count(self, *, approximate: bool = False) -> int:
+        """
+        Method returning the number of records in a table, cached for COUNT_CACHE_TTL seconds.
+        The approximate number is taken from the PostgreSQL planner statistics
+        """
+        cached = self.cache.counts.get(approximate)
+        if cached is not None and time.monotonic() - cached[1] < COUNT_CACHE_TTL:
+            return cached[0]
+
+        total = None
+        if approximate and self.dialect_name() == 'postgresql':
+            total = self.database.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+                {'table': f'"{self.model.__tablename__}"'}
+            ).scalar()
+        if total is None or total <= 0:
+            total = self.database.query(func.count(self.primary_key())).scalar()
+
+        self.cache.counts[approximate] = (total, time.monotonic())
+        return total
+
+    def commit(self, record_id: Optional[int] = None):
+        """
+        Method committing the session, invalidating the changed record
+        and notifying listeners that the table changed
+        """
+        self.database.commit()
+        if record_id is not None:
+            self.invalidate_record(record_id)
+        self.cache.changed()
+
+    def dialect_name(self) -> str:
+        """Method returning the name of the database dialect used by the session"""
+        return self.database.bind.dialect.name
+
+    def primary_key(self):
+        """Method returning the primary key column of the model"""
+        return getattr(self.model, self.model.__mapper__.primary_key[0].key)
+
+    @replica_read
+    def keyset_multi(
+            self, query, keys: SortKeys, cursor: Optional[str] = None, per_page: int = 10
+    ) -> Tuple[ListSchemaType, Optional[str]]:
+        """Method for keyset pagination of multy queries, primary key breaks ties"""
+        items, next_cursor = keyset_paginate(self.rows_query(query),
+                                             keys + [(self.primary_key(), 'asc')],
+                                             cursor=cursor, per_page=per_page)
+        return self.serialize(items), next_cursor
+
+    def get_multi_keyset(
+            self, *, cursor: Optional[str] = None, per_page: int = 10
+    ) -> Tuple[ListSchemaType, Optional[str]]:
+        """Method to read records from a table page by page using an opaque cursor"""
+        return self.keyset_multi(self.multy_query(), [], cursor=cursor, per_page=per_page)
+
+    def resolve_ids(self, model: Type[ModelType], ids: List[Any]) -> List[ModelType]:
+        """
+        Method for fetching records of the model by ids with a single IN query.
+        Ids are compared as integers, so '01' and 1 are the same record, duplicates
+        are skipped, missing ids and ids that are not integers raise MissingRecordsError
+        """
+        numbers, invalid = [], []
+        for record_id in ids:
+            try:
+                numbers.append(int(record_id))
+            except (TypeError, ValueError):
+                invalid.append(str(record_id))
+        numbers = list(dict.fromkeys(numbers))
+        records = {}
+        if numbers:
+            primary_key = getattr(model, model.__mapper__.primary_key[0].key)
+            records = {getattr(record, primary_key.key): record for record in
+                       self.database.query(model).filter(primary_key.in_(numbers))}
+        missing = [str(record_id) for record_id in numbers if record_id not in records]
+        if missing or invalid:
+            raise MissingRecordsError(
+                f"Records with ids {', '.join(missing + invalid)} in {model.__tablename__} "
+                f"table don't exist.")
+        return [records[record_id] for record_id in numbers]
 
     def create(self, obj_in: Union[CreateSchemaType, Dict[str, Any]], **kwargs) -> BaseSchemaType:
         """Method to create one record"""
         record = self.check_validate_create(obj_in)
         database_obj = self.model(**obj_in)
         self.database.add(database_obj)
-        self.database.commit()
+        self.commit()
         self.database.refresh(database_obj)
         return record
 
@@ -60,7 +309,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType], CRUDAbstr
         """Method to update one record"""
         database_obj = self.check_validate_update(obj_in, record_id)
         record = self.schema.from_orm(database_obj)
-        self.database.commit()
+        self.commit(record_id)
         self.database.refresh(database_obj)
         return record
 
@@ -68,7 +317,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType], CRUDAbstr
         """Method to delete one record by id"""
         obj = self.database.query(self.model).get(record_id)
         self.database.delete(obj)
-        self.database.commit()
+        self.commit(record_id)
         return self.schema.from_orm(obj)
 
     def check_db_error(self, data: Dict[str, Any]):
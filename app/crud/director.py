@@ -1,6 +1,6 @@
 """Module with director CRUD realisation"""
 
-from app.models import Director, Film
+from app.models import Director, film_director
 from app.schemas.director import DirectorCreate, DirectorUpdate, DirectorBase, DirectorList
 from .base import CRUDBase
 
@@ -12,11 +12,12 @@ class CRUDDirector(CRUDBase[Director, DirectorCreate, DirectorUpdate]):
     def remove(self, *, record_id: int) -> DirectorBase:
         """Method to delete one record by id and records with it in the associative table"""
         obj = self.database.query(self.model).get(record_id)
-        for film in self.database.query(Film).all():
-            if film.directors.count(obj) > 0:
-                film.directors.remove(obj)
+        self.database.flush()
+        self.database.execute(
+            film_director.delete().where(film_director.c.director_id == record_id))
+        self.database.expire(obj, ['films'])
         self.database.delete(obj)
-        self.database.commit()
+        self.commit(record_id)
         return self.schema.from_orm(obj)
 
 
@@ -1,29 +1,90 @@
 """Module with film CRUD realisation"""
 
-from typing import List, Dict, Any
+import re
+from datetime import date, MINYEAR
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import extract
+from pydantic import ValidationError
+from sqlalchemy import func, insert, literal_column, select, text, tuple_
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import selectinload
 
 from app.models import Genre, Director, Film
 from app.schemas.film import FilmCreate, FilmUpdate, FilmBase, FilmList
 from app.models.db_init import db
+from app.schemas.serializer import serialize_rows
 from .base import CRUDBase
 from .film_base import FilmAbstract
+from .pagination import SortKeys
+
+BULK_UPDATE_FIELDS = ('title', 'poster', 'description', 'release_date', 'rating')
+NO_DESCRIPTION = 'Film has no description.'
 
 
 class CRUDFilm(CRUDBase[Film, FilmCreate, FilmUpdate], FilmAbstract):
     """A class that inherits the base CRUD class and implements
     own methods to perform operations for the film model"""
+    # Filters, sorts, batch operations and the export of films share the schemas
+    # and loading options of the class, so they are kept on it as public methods
+    # pylint: disable=too-many-public-methods
+    trigram: Optional[bool] = None
+    list_mode: str = 'orm'
 
     def create(self, obj_in: Dict[str, Any], **kwargs) -> FilmBase:
         """Method to create one record"""
         database_obj = self.check_validate_create(obj_in, **kwargs)
         new_film = self.schema.from_orm(database_obj)
         self.database.add(database_obj)
-        self.database.commit()
+        self.commit()
         self.database.refresh(database_obj)
         return new_film
 
+    def aggregate_mode(self) -> bool:
+        """
+        Method checking whether film lists are read with one PostgreSQL statement
+        aggregating directors and genres, the ORM path is used for other databases
+        """
+        return self.list_mode == 'aggregate' and self.dialect_name() == 'postgresql'
+
+    def loader_options(self) -> list:
+        """Method returning loader options, the aggregate query needs none"""
+        if self.aggregate_mode():
+            return []
+        return super().loader_options()
+
+    def aggregated_relationship(self, name: str):
+        """Method returning a correlated subquery with the relationship records as JSONB array"""
+        relationship = getattr(self.model, name).property
+        related = relationship.mapper.class_
+        columns = self.schema_columns(related, self.schema.__fields__[name].type_)
+        record = func.jsonb_build_object(
+            *[item for column in columns for item in (column.key, column)])
+        primary_key = related.__mapper__.primary_key[0]
+        return select(func.coalesce(func.jsonb_agg(aggregate_order_by(record, primary_key)),
+                                    literal_column("'[]'::jsonb"))) \
+            .select_from(related) \
+            .where(relationship.primaryjoin, relationship.secondaryjoin) \
+            .scalar_subquery().label(name)
+
+    def rows_query(self, query):
+        """
+        Method selecting only the schema columns in the aggregate mode,
+        directors and genres are aggregated into JSONB arrays by the same statement
+        """
+        if not self.aggregate_mode():
+            return query
+        return query.with_entities(
+            self.model.film_id, *self.schema_columns(self.model, self.schema),
+            *[self.aggregated_relationship(name) for name in self.relationships])
+
+    def serialize(self, items: List[Any]) -> FilmList:
+        """Method building the list schema from records or rows of the aggregate query"""
+        if not self.aggregate_mode():
+            return super().serialize(items)
+        return serialize_rows(self.list_schema, self.schema,
+                              [item._asdict() for item in items], mapping=True)
+
     def check_db_error(self, data: Dict[str, Any]):
         """Method for checking title duplicates"""
         if 'title' in data.keys():
@@ -39,57 +100,430 @@ class CRUDFilm(CRUDBase[Film, FilmCreate, FilmUpdate], FilmAbstract):
         data['directors'] = []
         data['genres'] = []
         self.schema.parse_obj(data)
+        relations = self.resolve_relations(directors_id=kwargs['directors'],
+                                           genres_id=kwargs['genres'])
         database_obj = self.model(**obj_in_data)
-        directors_id = kwargs['directors']
-        genres_id = kwargs['genres']
-        directors = [self.database.query(Director).get(i) for i in directors_id]
-        genres = [self.database.query(Genre).get(i) for i in genres_id]
-        for genre in genres:
-            database_obj.genres.append(genre)
-        for director in directors:
-            database_obj.directors.append(director)
+        for name, records in relations.items():
+            setattr(database_obj, name, records)
         return database_obj
 
-    def multy_query(self):
-        """Method for creating multy queries"""
-        return self.database.query(self.model)
+    def resolve_relations(self, directors_id: Optional[List[Any]] = None,
+                          genres_id: Optional[List[Any]] = None) -> Dict[str, List[Any]]:
+        """
+        Method fetching film directors and genres with one query per table.
+        Everything is resolved before the film is touched, so a missing id changes nothing
+        """
+        relations = {}
+        if directors_id is not None:
+            relations['directors'] = self.resolve_ids(Director, directors_id)
+        if genres_id is not None:
+            relations['genres'] = self.resolve_ids(Genre, genres_id)
+        return relations
+
+    @staticmethod
+    def parse_ids(value: Any, name: str) -> List[int]:
+        """Method parsing record ids given as an 1&2&4 string or a list"""
+        if value is None or value == '':
+            return []
+        try:
+            ids = [int(record_id) for record_id in
+                   (value.split('&') if isinstance(value, str) else value)]
+        except (TypeError, ValueError) as error:
+            raise ValueError(f"Incorrect {name} ids!") from error
+        return list(dict.fromkeys(ids))
+
+    def bulk_values(self, row: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+        """Method returning validated column values of an imported film"""
+        record = self.schema.parse_obj({**row, 'directors': [], 'genres': []})
+        description = row.get('description')
+        if description is not None and not isinstance(description, str):
+            raise ValueError("Incorrect description!")
+        if description == '':
+            description = NO_DESCRIPTION
+        return {'user_id': user_id, 'title': record.title, 'poster': str(record.poster),
+                'description': description, 'release_date': record.release_date,
+                'rating': record.rating}
+
+    @staticmethod
+    def validation_message(error: ValidationError) -> str:
+        """Method joining the errors of a pydantic validation into one message"""
+        return '; '.join(f"{'.'.join(map(str, item['loc']))}: {item['msg']}"
+                         for item in error.errors())
+
+    def parse_batch(
+            self, rows: Dict[Any, Dict[str, Any]],
+            parse: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Tuple[Dict[Any, Dict[str, Any]], Dict[Any, Dict[str, List[int]]], Dict[Any, str]]:
+        """
+        Method validating the rows of a batch with parse and parsing their directors
+        and genres ids, relationships missing from a row are left out.
+        Returns the values and relations of the valid rows and the errors by the row key
+        """
+        values: Dict[Any, Dict[str, Any]] = {}
+        relations: Dict[Any, Dict[str, List[int]]] = {}
+        errors: Dict[Any, str] = {}
+        for key, row in rows.items():
+            try:
+                values[key] = parse(row)
+                relations[key] = {name: self.parse_ids(row[name], name)
+                                  for name in self.relationships if name in row}
+            except ValidationError as error:
+                errors[key] = self.validation_message(error)
+            except ValueError as error:
+                errors[key] = str(error)
+        return {key: value for key, value in values.items() if key not in errors}, \
+            relations, errors
+
+    def check_titles(self, titles: Dict[Any, str], repeated: str,
+                     renamed: bool = False) -> Dict[Any, str]:
+        """
+        Method returning the errors of the titles repeated in the batch
+        or already taken, the existing titles are read with one query.
+        With renamed the keys are film ids and a film may keep its own title
+        """
+        errors: Dict[Any, str] = {}
+        first: Dict[str, Any] = {}
+        for key, title in titles.items():
+            if title in first:
+                errors[key] = repeated
+            else:
+                first[title] = key
+        if first:
+            for title, film_id in self.database.query(self.model.title, self.model.film_id) \
+                    .filter(self.model.title.in_(list(first))):
+                if not renamed or film_id != first[title]:
+                    errors[first[title]] = "Film with such title already exist."
+        return errors
+
+    def related_records(self, name: str, ids: Set[int], load: bool = False) -> Dict[int, Any]:
+        """
+        Method returning the records of the relationship by id read with one IN query,
+        only the ids are read unless load is set
+        """
+        related = getattr(self.model, name).property.mapper.class_
+        primary_key = getattr(related, related.__mapper__.primary_key[0].key)
+        if not ids:
+            return {}
+        if not load:
+            return {record_id: record_id for (record_id,) in
+                    self.database.query(primary_key).filter(primary_key.in_(ids))}
+        return {getattr(record, primary_key.key): record for record in
+                self.database.query(related).filter(primary_key.in_(ids))}
+
+    def check_relations(
+            self, relations: Dict[Any, Dict[str, List[int]]], keys: List[Any], load: bool = False
+    ) -> Tuple[Dict[str, Dict[int, Any]], Dict[Any, str]]:
+        """
+        Method reading the directors and genres of the batch rows with one query per table.
+        Returns the records by id and the errors of the rows referencing missing records
+        """
+        records = {name: self.related_records(
+            name, {record_id for key in keys for record_id in relations[key].get(name, [])}, load)
+            for name in self.relationships}
+        errors: Dict[Any, str] = {}
+        for key in keys:
+            for name, ids in relations[key].items():
+                missing = [str(record_id) for record_id in ids if record_id not in records[name]]
+                if missing:
+                    errors[key] = f"Records with ids {', '.join(missing)} in {name} don't exist."
+                    break
+        return records, errors
+
+    def insert_batch(self, values: List[Dict[str, Any]], relations: List[Dict[str, List[int]]]):
+        """Method inserting films and their directors and genres links, then committing them"""
+        self.database.execute(insert(self.model), values)
+        film_ids = dict(self.database.query(self.model.title, self.model.film_id)
+                        .filter(self.model.title.in_([value['title'] for value in values])))
+        for name in self.relationships:
+            relationship = getattr(self.model, name).property
+            film_column = relationship.synchronize_pairs[0][1].key
+            related_column = relationship.secondary_synchronize_pairs[0][1].key
+            links = [{film_column: film_ids[value['title']], related_column: record_id}
+                     for value, relation in zip(values, relations)
+                     for record_id in relation.get(name, [])]
+            if links:
+                self.database.execute(relationship.secondary.insert(), links)
+        self.commit()
+
+    def bulk_create(self, rows: List[Dict[str, Any]], user_id: int) -> Dict[int, str]:
+        """
+        Method creating a batch of films with multi-row inserts and one commit.
+        Titles, directors and genres are checked with one query per table for the batch,
+        invalid rows are skipped and their errors are returned by the row index
+        """
+        values, relations, errors = self.parse_batch(
+            dict(enumerate(rows)), lambda row: self.bulk_values(row, user_id))
+        errors.update(self.check_titles({index: value['title'] for index, value in values.items()},
+                                        "Film with such title is repeated in the import."))
+        valid = [index for index in values if index not in errors]
+        errors.update(self.check_relations(relations, valid)[1])
+        valid = [index for index in valid if index not in errors]
+        if not valid:
+            return errors
+        try:
+            self.insert_batch([values[index] for index in valid],
+                              [relations[index] for index in valid])
+        except (IntegrityError, DataError) as error:
+            self.database.rollback()
+            errors.update({index: f"The batch could not be saved: {error.orig}"
+                           for index in valid})
+        return errors
+
+    def owned_films(self, ids: List[int], user_id: int,
+                    admin: bool = False) -> Tuple[List[int], Dict[int, str]]:
+        """
+        Method checking with one query which films the user may change.
+        Returns the allowed ids and the statuses of the others by id
+        """
+        owners = dict(self.database.query(self.model.film_id, self.model.user_id)
+                      .filter(self.model.film_id.in_(ids))) if ids else {}
+        statuses = {}
+        for film_id in ids:
+            if film_id not in owners:
+                statuses[film_id] = 'not_found'
+            elif not admin and owners[film_id] != user_id:
+                statuses[film_id] = 'forbidden'
+        return [film_id for film_id in ids if film_id not in statuses], statuses
+
+    def bulk_update_values(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Method returning validated column values of a film updated in a batch"""
+        values = {field: item[field] for field in BULK_UPDATE_FIELDS if field in item}
+        for field, value in values.items():
+            if value is None and not self.model.__table__.columns[field].nullable:
+                raise ValueError(f"Field {field} can't be empty!")
+        record = self.update_schema.parse_obj(values)
+        return {field: str(getattr(record, field)) if field == 'poster'
+                else getattr(record, field) for field in values}
+
+    @staticmethod
+    def parse_update_items(
+            items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[int, Dict[str, Any]]]:
+        """
+        Method returning the results of the batch items, items without an integer
+        or with a repeated film id are marked invalid, and the other items by film id
+        """
+        results = [{'film_id': item.get('film_id') if isinstance(item, dict) else None}
+                   for item in items]
+        by_id: Dict[int, Dict[str, Any]] = {}
+        for result, item in zip(results, items):
+            film_id = result['film_id']
+            if not isinstance(film_id, int) or isinstance(film_id, bool):
+                result.update(status='invalid', error="Film id must be an integer.")
+            elif film_id in by_id:
+                result.update(status='invalid', error="Film is repeated in the batch.")
+            else:
+                by_id[film_id] = item
+        return results, by_id
+
+    def apply_updates(self, film_ids: List[int], values: Dict[int, Dict[str, Any]],
+                      relations: Dict[int, Dict[str, List[int]]],
+                      records: Dict[str, Dict[int, Any]]) -> Dict[int, str]:
+        """
+        Method setting the values, directors and genres of the films and committing them,
+        the relationships changed in the batch are loaded with one query per table.
+        Returns the errors of all the films if the batch could not be saved
+        """
+        query = self.database.query(self.model).filter(self.model.film_id.in_(film_ids))
+        changed = [name for name in self.relationships
+                   if any(name in relations[film_id] for film_id in film_ids)]
+        if changed:
+            query = query.options(*[selectinload(getattr(self.model, name)) for name in changed])
+        try:
+            for database_obj in query:
+                for field, value in values[database_obj.film_id].items():
+                    setattr(database_obj, field, value)
+                for name, ids in relations[database_obj.film_id].items():
+                    setattr(database_obj, name, [records[name][record_id] for record_id in ids])
+            self.commit()
+        except (IntegrityError, DataError) as error:
+            self.database.rollback()
+            return {film_id: f"The batch could not be saved: {error.orig}" for film_id in film_ids}
+        for film_id in film_ids:
+            self.invalidate_record(film_id)
+        return {}
+
+    @staticmethod
+    def update_results(results: List[Dict[str, Any]], statuses: Dict[int, str],
+                       errors: Dict[int, str]) -> List[Dict[str, Any]]:
+        """Method completing the results of the batch items with their statuses and errors"""
+        for result in results:
+            if 'status' in result:
+                continue
+            film_id = result['film_id']
+            if film_id in statuses:
+                result['status'] = statuses[film_id]
+            elif film_id in errors:
+                result.update(status='invalid', error=errors[film_id])
+            else:
+                result['status'] = 'updated'
+        return results
+
+    def bulk_update(self, items: List[Dict[str, Any]], user_id: int,
+                    admin: bool = False) -> List[Dict[str, Any]]:
+        """
+        Method updating a batch of films in one transaction on behalf of the user.
+        Ownership is checked first, then the titles, directors and genres of the allowed
+        films with one query per table, the status of every item is returned in order
+        """
+        results, by_id = self.parse_update_items(items)
+        allowed, statuses = self.owned_films(list(by_id), user_id, admin)
+        values, relations, errors = self.parse_batch(
+            {film_id: by_id[film_id] for film_id in allowed}, self.bulk_update_values)
+        errors.update(self.check_titles(
+            {film_id: value['title'] for film_id, value in values.items() if 'title' in value},
+            "Film with such title is repeated in the batch.", renamed=True))
+        valid = [film_id for film_id in values if film_id not in errors]
+        records, relation_errors = self.check_relations(relations, valid, load=True)
+        errors.update(relation_errors)
+        valid = [film_id for film_id in valid if film_id not in errors]
+        if valid:
+            errors.update(self.apply_updates(valid, values, relations, records))
+        return self.update_results(results, statuses, errors)
 
-    def query_paginate(self, query: db.session.query, page: int = 1, per_page: int = 10):
-        """Method for pagination multy queries"""
-        return query.paginate(page=page, per_page=per_page).items
+    def bulk_remove(self, ids: List[int], user_id: int,
+                    admin: bool = False) -> List[Dict[str, Any]]:
+        """
+        Method deleting a batch of films in one transaction on behalf of the user.
+        Ownership is checked with one query, the films and their directors and genres
+        links are deleted with one statement per table
+        """
+        ids = list(dict.fromkeys(ids))
+        allowed, statuses = self.owned_films(ids, user_id, admin)
+        if allowed:
+            self.database.flush()
+            for name in self.relationships:
+                relationship = getattr(self.model, name).property
+                film_column = relationship.synchronize_pairs[0][1]
+                self.database.execute(
+                    relationship.secondary.delete().where(film_column.in_(allowed)))
+            self.database.query(self.model).filter(self.model.film_id.in_(allowed)) \
+                .delete(synchronize_session='fetch')
+            self.commit()
+            for film_id in allowed:
+                self.invalidate_record(film_id)
+        return [{'film_id': film_id, 'status': statuses.get(film_id, 'deleted')}
+                for film_id in ids]
 
-    def get_multi_by_title(self, title: str, page: int = 1, per_page: int = 10) -> FilmList:
+    def export_batches(self, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Method streaming all films with their directors and genres ids in batches.
+        Films are read through a server-side cursor of a separate connection in one
+        repeatable read transaction, so memory use is constant and the export is consistent
+        """
+        columns = list(self.model.__table__.columns)
+        options = {'isolation_level': 'REPEATABLE READ'} \
+            if self.dialect_name() == 'postgresql' else {}
+        with self.database.bind.connect().execution_options(**options) as connection:
+            with connection.begin():
+                result = connection.execution_options(stream_results=True).execute(
+                    select(*columns).order_by(self.primary_key().asc()))
+                for rows in result.partitions(batch_size):
+                    film_ids = [row.film_id for row in rows]
+                    links: Dict[str, Dict[int, List[int]]] = {}
+                    for name in self.relationships:
+                        relationship = getattr(self.model, name).property
+                        film_column = relationship.synchronize_pairs[0][1]
+                        related_column = relationship.secondary_synchronize_pairs[0][1]
+                        links[name] = {}
+                        for film_id, record_id in connection.execute(
+                                select(film_column, related_column)
+                                .where(film_column.in_(film_ids))
+                                .order_by(film_column, related_column)):
+                            links[name].setdefault(film_id, []).append(record_id)
+                    yield [{**row._asdict(), **{name: links[name].get(row.film_id, [])
+                                                 for name in self.relationships}}
+                           for row in rows]
+
+    def update(self, *, record_id: int, obj_in: Dict[str, Any], **kwargs) -> FilmBase:
+        """Method to update one record and optionally replace its directors and genres"""
+        relations = self.resolve_relations(directors_id=kwargs.get('directors'),
+                                           genres_id=kwargs.get('genres'))
+        database_obj = self.check_validate_update(obj_in, record_id)
+        for name, records in relations.items():
+            setattr(database_obj, name, records)
+        record = self.schema.from_orm(database_obj)
+        self.commit(record_id)
+        self.database.refresh(database_obj)
+        return record
+
+    def title_query(self, title: str):
+        """
+        Method for creating a query with a partial match of a movie title,
+        on PostgreSQL it is served by the ix_film_title_trgm GIN index
+        """
+        return self.multy_query().filter(self.model.title.ilike(f'%{title}%'))
+
+    def trigram_available(self) -> bool:
+        """Method checking once whether the pg_trgm extension backs the title search"""
+        if self.trigram is None:
+            self.trigram = self.dialect_name() == 'postgresql' and self.database.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).first() is not None
+        return self.trigram
+
+    def relevance_order(self, title: str) -> list:
+        """
+        Method returning order by clauses from the most to the least relevant title:
+        by trigram similarity when pg_trgm is installed, otherwise prefix matches
+        and shorter titles go first
+        """
+        if self.trigram_available():
+            return [func.similarity(self.model.title, title).desc(),
+                    self.model.film_id.asc()]
+        return [self.model.title.ilike(f'{title}%').desc(),
+                func.length(self.model.title).asc(),
+                self.model.film_id.asc()]
+
+    def get_multi_by_title(
+            self, title: str, page: int = 1, per_page: int = 10, relevance: bool = False
+    ) -> FilmList:
         """A method that searches for a partial match of a movie title"""
-        title = f'%{title}%'
-        return self.list_schema.from_orm(
-            [self.schema.from_orm(item) for item in
-             self.query_paginate(
-                 self.multy_query()
-                 .filter(self.model.title.ilike(title))
-                 .order_by(self.model.film_id.asc()),
-                 page=page, per_page=per_page)])
+        order = self.relevance_order(title) if relevance else [self.model.film_id.asc()]
+        return self.paginate_multi(self.title_query(title).order_by(*order),
+                                   page=page, per_page=per_page)
+
+    def get_multi_by_title_keyset(
+            self, title: str, cursor: Optional[str] = None, per_page: int = 10
+    ) -> Tuple[FilmList, Optional[str]]:
+        """A method that searches for a partial match of a movie title using an opaque cursor"""
+        return self.keyset_multi(self.title_query(title), [], cursor=cursor, per_page=per_page)
 
     def date_filter(self, query: db.session.query, value: str):
-        """Method for filtering by release date"""
-        start_year, end_year = value.split('-')
-        return query.filter(extract('year', self.model.release_date).between(start_year, end_year))
+        """
+        Method for filtering by release date, the YYYY-YYYY range of years
+        is compared with the raw column to allow an index range scan
+        """
+        match = re.match(r'^(\d{4})-(\d{4})$', value)
+        if match is None or int(match.group(1)) > int(match.group(2)) \
+                or int(match.group(1)) < MINYEAR:
+            raise ValueError("Incorrect release date range!")
+        start_year, end_year = int(match.group(1)), int(match.group(2))
+        return query.filter(self.model.release_date >= date(start_year, 1, 1),
+                            self.model.release_date <= date(end_year, 12, 31))
 
     def director_filter(self, query: db.session.query, value: str):
-        """Method for filtering by directors"""
-        directors_names = value.split('&')
-        return query.filter(self.model.directors
-                            .any((Director.name + '_' + Director.surname).in_(directors_names)))
+        """
+        Method for filtering by directors, Name_Surname values are matched
+        with a tuple IN served by the ix_director_name_surname index.
+        Every split at an underscore is a candidate pair, so a value matches
+        the directors whose name and surname joined with '_' are equal to it
+        """
+        directors_names = [(name[:index], name[index + 1:]) for name in value.split('&')
+                           for index, char in enumerate(name) if char == '_']
+        return query.filter(self.model.directors.any(
+            tuple_(Director.name, Director.surname).in_(directors_names)))
 
     def genre_filter(self, query: db.session.query, value: str):
         """Method for filtering by genres"""
         genres_names = value.split('&')
         return query.filter(self.model.genres.any(Genre.genre_name.in_(genres_names)))
 
-    def query_film_multy_filter(
-            self, values: List[str], page: int = 1, per_page: int = 10
-    ) -> FilmList:
-        """Method for filtering records by genres, release_date and directors"""
-        query = self.database.query(self.model).distinct()
+    def multy_filter_query(self, values: List[str]):
+        """
+        Method for creating a query filtered by genres, release_date and directors,
+        the filters are EXISTS subqueries, so films are not duplicated
+        """
+        query = self.multy_query()
 
         if values[0] is not None:
             query = self.date_filter(query=query, value=values[0])
@@ -97,11 +531,23 @@ class CRUDFilm(CRUDBase[Film, FilmCreate, FilmUpdate], FilmAbstract):
             query = self.director_filter(query=query, value=values[1])
         if values[2] is not None:
             query = self.genre_filter(query=query, value=values[2])
+        return query
+
+    def query_film_multy_filter(
+            self, values: List[str], page: int = 1, per_page: int = 10
+    ) -> FilmList:
+        """Method for filtering records by genres, release_date and directors"""
+        return self.paginate_multi(
+            self.multy_filter_query(values).order_by(self.model.film_id.asc()),
+            page=page, per_page=per_page)
 
-        return self.list_schema.from_orm(
-            [self.schema.from_orm(item) for item in query
-             .order_by(self.model.film_id.asc())
-             .paginate(page=page, per_page=per_page).items])
+    def query_film_multy_filter_keyset(
+            self, values: List[str], cursor: Optional[str] = None, per_page: int = 10
+    ) -> Tuple[FilmList, Optional[str]]:
+        """Method for filtering records by genres, release_date and directors
+        using an opaque cursor"""
+        return self.keyset_multi(self.multy_filter_query(values), [],
+                                 cursor=cursor, per_page=per_page)
 
     def date_asc(self, query: db.session.query):
         """Method to sort by date in ascending order"""
@@ -138,9 +584,23 @@ class CRUDFilm(CRUDBase[Film, FilmCreate, FilmUpdate], FilmAbstract):
             if order[1] == 'desc':
                 query = self.rating_desc(query)
 
-        return self.list_schema.from_orm(
-            [self.schema.from_orm(item) for item in
-             self.query_paginate(query, page=page, per_page=per_page)])
+        return self.paginate_multi(query, page=page, per_page=per_page)
+
+    def sort_keys(self, order: List[str]) -> SortKeys:
+        """Method returning sort keys by release_date and rating for keyset pagination"""
+        keys = []
+        for column, direction in zip((self.model.release_date, self.model.rating), order):
+            if direction in ('asc', 'desc'):
+                keys.append((column, direction))
+        return keys
+
+    def query_film_multy_sort_keyset(
+            self, order: List[str], cursor: Optional[str] = None, per_page: int = 10
+    ) -> Tuple[FilmList, Optional[str]]:
+        """Method for sorting records by release_date and rating using an opaque cursor"""
+        return self.keyset_multi(self.multy_query(), self.sort_keys(order),
+                                 cursor=cursor, per_page=per_page)
 
 
-film = CRUDFilm(Film, FilmBase, FilmUpdate, FilmList)
+film = CRUDFilm(Film, FilmBase, FilmUpdate, FilmList, relationships=('directors', 'genres'),
+                projection=True)
@@ -1,7 +1,7 @@
 """Module with abstract class for additional requests to the film model"""
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Tuple
 
 from app.schemas import FilmList
 
@@ -10,7 +10,7 @@ class FilmAbstract(ABC):
     """Abstract class for additional requests to the film model"""
     @abstractmethod
     def get_multi_by_title(
-            self, title: str, page: int = 1, per_page: int = 10
+            self, title: str, page: int = 1, per_page: int = 10, relevance: bool = False
     ) -> FilmList:
         """A method that searches for a partial match of a film title"""
 
@@ -25,3 +25,22 @@ class FilmAbstract(ABC):
             self, order: List[str], page: int = 1, per_page: int = 10
     ) -> FilmList:
         """Method for sorting records by release_date and rating"""
+
+    @abstractmethod
+    def get_multi_by_title_keyset(
+            self, title: str, cursor: Optional[str] = None, per_page: int = 10
+    ) -> Tuple[FilmList, Optional[str]]:
+        """A method that searches for a partial match of a film title using an opaque cursor"""
+
+    @abstractmethod
+    def query_film_multy_filter_keyset(
+            self, values: List[str], cursor: Optional[str] = None, per_page: int = 10
+    ) -> Tuple[FilmList, Optional[str]]:
+        """Method for filtering records by genres, release_date and directors
+        using an opaque cursor"""
+
+    @abstractmethod
+    def query_film_multy_sort_keyset(
+            self, order: List[str], cursor: Optional[str] = None, per_page: int = 10
+    ) -> Tuple[FilmList, Optional[str]]:
+        """Method for sorting records by release_date and rating using an opaque cursor"""
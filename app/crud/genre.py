@@ -1,7 +1,7 @@
 """Module with genre CRUD realisation"""
 from typing import Dict, Any
 
-from app.models import Genre, Film
+from app.models import Genre, film_genre
 from app.schemas.genre import GenreCreate, GenreUpdate, GenreBase, GenreList
 from .base import CRUDBase
 
@@ -19,11 +19,11 @@ class CRUDGenre(CRUDBase[Genre, GenreCreate, GenreUpdate]):
     def remove(self, *, record_id: int) -> GenreBase:
         """Method to delete one record by id and records with it in the associative table"""
         obj = self.database.query(self.model).get(record_id)
-        for film in self.database.query(Film).all():
-            if film.genres.count(obj) > 0:
-                film.genres.remove(obj)
+        self.database.flush()
+        self.database.execute(film_genre.delete().where(film_genre.c.genre_id == record_id))
+        self.database.expire(obj, ['films'])
         self.database.delete(obj)
-        self.database.commit()
+        self.commit(record_id)
         return self.schema.from_orm(obj)
 
 
@@ -0,0 +1,98 @@
+"""Module with offset and keyset (cursor) pagination helpers"""
+
+import base64
+import binascii
+import json
+from datetime import date
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from werkzeug.exceptions import NotFound
+
+SortKeys = List[Tuple[Any, str]]
+
+
+def offset_paginate(query, page: int = 1, per_page: int = 10) -> Tuple[list, bool]:
+    """
+    Function for offset pagination without the COUNT(*) query.
+    Returns records of the page and whether there are more records after it,
+    an empty page other than the first one is not found like in Flask-SQLAlchemy
+    """
+    if page < 1 or per_page < 0:
+        raise NotFound()
+    items = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    if not items[:per_page] and page != 1:
+        raise NotFound()
+    return items[:per_page], len(items) > per_page
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Function for encoding the sort key values of the last row into an opaque cursor"""
+    data = [value.isoformat() if isinstance(value, date) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def cursor_value(column, value: Any) -> Any:
+    """
+    Function converting a decoded cursor value to the python type of the sort column,
+    so a damaged cursor is rejected before it reaches the database
+    """
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is date:
+        try:
+            return date.fromisoformat(value)
+        except (TypeError, ValueError) as error:
+            raise ValueError("Invalid cursor!") from error
+    if python_type is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, python_type) or isinstance(value, bool) and python_type is not bool:
+        raise ValueError("Invalid cursor!")
+    return value
+
+
+def decode_cursor(cursor: str, keys: SortKeys) -> List[Any]:
+    """Function for decoding an opaque cursor into the sort key values"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError) as error:
+        raise ValueError("Invalid cursor!") from error
+
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Invalid cursor!")
+    return [cursor_value(column, value) for (column, _), value in zip(keys, values)]
+
+
+def keyset_order(keys: SortKeys) -> list:
+    """Function returning order by clauses for the sort keys"""
+    return [column.asc() if direction == 'asc' else column.desc() for column, direction in keys]
+
+
+def keyset_filter(keys: SortKeys, values: List[Any]):
+    """Function returning a filter that seeks to the rows following the given key values"""
+    clauses = []
+    for index, (column, direction) in enumerate(keys):
+        following = column > values[index] if direction == 'asc' else column < values[index]
+        previous = [keys[i][0] == values[i] for i in range(index)]
+        clauses.append(and_(*previous, following))
+    return or_(*clauses)
+
+
+def keyset_paginate(query, keys: SortKeys, cursor: Optional[str] = None,
+                    per_page: int = 10) -> Tuple[list, Optional[str]]:
+    """
+    Function for keyset pagination of a query ordered by the sort keys.
+    Returns records of the page and the cursor of the next page (None for the last page)
+    """
+    if cursor:
+        query = query.filter(keyset_filter(keys, decode_cursor(cursor, keys)))
+    items = query.order_by(*keyset_order(keys)).limit(per_page + 1).all()
+    if cursor and not items:
+        raise NotFound()
+
+    if len(items) <= per_page:
+        return items, None
+    items = items[:per_page]
+    return items, encode_cursor([getattr(items[-1], column.key) for column, _ in keys])
@@ -1,6 +1,6 @@
 """Module with the logical part of the project"""
 
-from typing import Union, Dict, Any, List
+from typing import Union, Dict, Any, List, Optional
 
 from .crud.abstract import CRUDAbstract
 from .crud.base import CreateSchemaType, UpdateSchemaType
@@ -12,11 +12,21 @@ def read(crud: CRUDAbstract, record_id: int):
     return crud.get(record_id=record_id)
 
 
+def read_many(crud: CRUDAbstract, ids: List[int]):
+    """Method to read records by ids in the order of the ids"""
+    return crud.get_many(ids)
+
+
 def read_multy(crud: CRUDAbstract, page: int = 1, per_page: int = 10):
     """Method to read all records from a table with default pagination set to 10"""
     return crud.get_multi(page=page, per_page=per_page)
 
 
+def count(crud: CRUDAbstract, approximate: bool = False):
+    """Method returning the number of records in a table"""
+    return crud.count(approximate=approximate)
+
+
 def create(crud: CRUDAbstract, values: Union[CreateSchemaType, Dict[str, Any]]):
     """Method to create one record"""
     return crud.create(obj_in=values)
@@ -36,7 +46,6 @@ def set_unknown_director(film: Dict[str, Any]) -> Dict[str, Any]:
     """Set directors = UNKNOWN if film has no any director"""
     if not bool(film['directors']):
         film['directors'] = 'UNKNOWN'
-    film['release_date'] = film['release_date'].isoformat()
     return film
 
 
@@ -51,12 +60,22 @@ def create_film(
     return film
 
 
+def update_films(film_crud: CRUDAbstract, items: List[Dict[str, Any]], user_id: int,
+                 admin: bool = False):
+    """Method to update a batch of films in one transaction"""
+    return film_crud.bulk_update(items, user_id=user_id, admin=admin)
+
+
+def delete_films(film_crud: CRUDAbstract, ids: List[int], user_id: int, admin: bool = False):
+    """Method to delete a batch of films in one transaction"""
+    return film_crud.bulk_remove(ids, user_id=user_id, admin=admin)
+
+
 def set_unknown_director_multy(films: Dict[str, List]) -> Dict[str, List]:
     """Set directors = UNKNOWN if film has no any director"""
     for film in films['__root__']:
         if not bool(film['directors']):
             film['directors'] = 'UNKNOWN'
-        film['release_date'] = film['release_date'].isoformat()
 
     return films
 
@@ -66,9 +85,25 @@ def read_films(crud: CRUDAbstract, page: int = 1, per_page: int = 10):
     return crud.get_multi(page=page, per_page=per_page)
 
 
-def get_multi_by_title(film_crud: FilmAbstract, title: str, page: int = 1, per_page: int = 10):
+def read_films_keyset(crud: CRUDAbstract, cursor: Optional[str] = None, per_page: int = 10):
+    """Method to read records from a table page by page using an opaque cursor"""
+    return crud.get_multi_keyset(cursor=cursor, per_page=per_page)
+
+
+def get_multi_by_title(
+        film_crud: FilmAbstract, title: str, page: int = 1, per_page: int = 10,
+        relevance: bool = False
+):
     """A method that searches for a partial match of a movie title"""
-    return film_crud.get_multi_by_title(page=page, per_page=per_page, title=title)
+    return film_crud.get_multi_by_title(page=page, per_page=per_page, title=title,
+                                        relevance=relevance)
+
+
+def get_multi_by_title_keyset(
+        film_crud: FilmAbstract, title: str, cursor: Optional[str] = None, per_page: int = 10
+):
+    """A method that searches for a partial match of a movie title using an opaque cursor"""
+    return film_crud.get_multi_by_title_keyset(cursor=cursor, per_page=per_page, title=title)
 
 
 def query_film_multy_filter(
@@ -79,9 +114,27 @@ def query_film_multy_filter(
     return film_crud.query_film_multy_filter(page=page, per_page=per_page, values=values)
 
 
+def query_film_multy_filter_keyset(
+        film_crud: FilmAbstract, values: List[Union[str, None]],
+        cursor: Optional[str] = None, per_page: int = 10
+):
+    """Method for filtering records by genres, release_date and directors
+    using an opaque cursor"""
+    return film_crud.query_film_multy_filter_keyset(cursor=cursor, per_page=per_page,
+                                                    values=values)
+
+
 def query_film_multy_sort(
         film_crud: FilmAbstract, order: List[Union[str, None]],
         page: int = 1, per_page: int = 10
 ):
     """Method for sorting records by release_date and rating"""
     return film_crud.query_film_multy_sort(page=page, per_page=per_page, order=order)
+
+
+def query_film_multy_sort_keyset(
+        film_crud: FilmAbstract, order: List[Union[str, None]],
+        cursor: Optional[str] = None, per_page: int = 10
+):
+    """Method for sorting records by release_date and rating using an opaque cursor"""
+    return film_crud.query_film_multy_sort_keyset(cursor=cursor, per_page=per_page, order=order)
@@ -1,5 +1,6 @@
 """Endpoints module __init__"""
 
+from .cache import CacheStats
 from .director import Director, Directors
 from .film import Film, Films, FilmsSorted, FilmsFiltered
 from .genre import Genre, Genres
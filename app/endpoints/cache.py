@@ -0,0 +1,21 @@
+"""Endpoints for cache monitoring"""
+
+from flask_restx import Resource
+
+from app.cache import film_cache
+from app.crud import director, film, genre, user
+from .namespaces import cache_ns
+
+
+@cache_ns.route('/stats', methods=['GET'], endpoint='cache_stats')
+class CacheStats(Resource):
+    """Class for implementing cache statistics request"""
+
+    @cache_ns.doc(responses={200: 'Success'})
+    def get(self):
+        """Get hit and miss counters of the record and response caches"""
+        return {
+            'records': {crud.model.__tablename__: crud.cache.stats()
+                        for crud in (director, film, genre, user)},
+            'responses': {film_cache.name: film_cache.stats()}
+        }
@@ -3,7 +3,7 @@
 from flask_restx import Resource, fields
 
 from app.crud import director
-from app.endpoints.todo import todo
+from app.endpoints.todo import IDS_PARAM, todo
 from .namespaces import director_ns
 
 director_model = director_ns.model('Director', {
@@ -66,3 +66,13 @@ class Directors(Resource):
     def get(self, page, per_page):
         """Get all records from the director table"""
         return todo.read_all(crud=director, page=page, per_page=per_page, t_name='director')
+
+
+@director_ns.route('', methods=['GET'], endpoint='directors_many')
+@director_ns.doc(params={'ids': IDS_PARAM})
+class DirectorsMany(Resource):
+    """Class for implementing directors get by ids request"""
+    @director_ns.doc(responses={200: 'Success', 400: 'Validation Error'})
+    def get(self):
+        """Get records from the director table by ids in the order of the ids"""
+        return todo.get_many(crud=director, t_name='director')
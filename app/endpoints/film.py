@@ -1,19 +1,30 @@
 """Endpoints for film"""
 
-from flask import request, jsonify
+import io
+from typing import Any, Dict, List, Optional
+from flask import Response, request, stream_with_context
 from pydantic.error_wrappers import ValidationError
 from sqlalchemy.exc import DataError
 from werkzeug.exceptions import NotFound
 from flask_login import current_user
 from flask_restx import Resource, fields
 
-from app.crud import film
-from app.endpoints.todo import todo
+from app.bulk import EXPORT_MIMETYPES, IMPORT_MIMETYPES, export_films, import_films
+from app.cache import film_cache
+from app.crud import film, genre, director, user
+from app.crud.base import MissingRecordsError
+from app.crud.film import NO_DESCRIPTION
+from app.endpoints.todo import IDS_PARAM, todo
 from app.domain import create_film, read_films, set_unknown_director_multy, \
-    query_film_multy_sort, query_film_multy_filter, set_unknown_director, get_multi_by_title
-from app.models import Film, Role
+    query_film_multy_sort, query_film_multy_filter, set_unknown_director, get_multi_by_title, \
+    read_films_keyset, get_multi_by_title_keyset, query_film_multy_filter_keyset, \
+    query_film_multy_sort_keyset, update_films, delete_films
+from app.models import Film
 from loggers import logger
-from .namespaces import film_ns
+from .namespaces import film_ns, output_json
+
+for crud in (film, genre, director, user):
+    crud.cache.listeners.append(film_cache.invalidate)
 
 film_create_model = film_ns.model('Film Create', {
     'title': fields.String(description='Film title', example='Peaky Blinders'),
@@ -75,6 +86,32 @@ film_model = film_ns.model('Film', {
     ])
 })
 
+CURSOR_PARAM = {'description': 'Opaque cursor for keyset pagination, pass an empty value '
+                               'for the first page and the X-Next-Cursor header value '
+                               'for the next ones (the page number is ignored)',
+                'example': 'WyIyMDEzLTA5LTEyIiwgMV0='}
+
+MAX_BATCH_SIZE = 1000
+
+
+def films_response(films: Dict[str, List[Any]], next_cursor: Optional[str] = None):
+    """Function for building a films list response with the next page cursor header"""
+    response = output_json(set_unknown_director_multy(films)['__root__'])
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+def is_admin() -> bool:
+    """Function checking whether the current user is an administrator by the cached role"""
+    return current_user.is_admin
+
+
+def invalid_cursor(cursor: str):
+    """Function for aborting a request with an invalid cursor"""
+    logger.error("Invalid pagination cursor %s received.", cursor)
+    film_ns.abort(400, message="Invalid pagination cursor.")
+
 
 @film_ns.route('/<int:film_id>', methods=['GET', 'PUT', 'DELETE'], endpoint='film')
 @film_ns.route('', methods=['POST'], endpoint='film_create')
@@ -112,7 +149,7 @@ class FilmBase(Resource):
         }
 
         if values['description'] == '':
-            values['description'] = 'Film has no description.'
+            values['description'] = NO_DESCRIPTION
 
         try:
             film_record = create_film(film, values=values,
@@ -127,6 +164,11 @@ class FilmBase(Resource):
             film_ns.abort(400, message="Incorrect data entered. The record could not be created.")
             return None
 
+        except MissingRecordsError as error:
+            logger.error("The record in film table could not be created. %s", error)
+            film_ns.abort(400, message=str(error))
+            return None
+
         except ValueError:
             logger.error("Attempt to create film with title that already exist.")
             film_ns.abort(400, "Film with such title already exist.")
@@ -138,8 +180,7 @@ class FilmBase(Resource):
             logger.error('An attempt to %s a movie by an unauthenticated user.', action)
             film_ns.abort(401, f'You need to be authenticated to {action} a film.')
         db_film = Film.query.get(film_id)
-        admin = Role.query.filter_by(name='admin').first()
-        if db_film.user_id != current_user.user_id and current_user.role_id != admin.role_id:
+        if db_film.user_id != current_user.user_id and not is_admin():
             logger.error("Not the user who added the film and not an administrator "
                          "try to %s a film. Access denied.", action)
             film_ns.abort(403, "Only the user who added the film or an administrator "
@@ -199,21 +240,165 @@ class FilmBase(Resource):
 @film_ns.route('/all/<int:page>', methods=['GET'],
                defaults={'per_page': 10}, endpoint='films_default')
 @film_ns.route('/all/<int:page>/<int:per_page>', methods=['GET'], endpoint='films')
-@film_ns.doc(params={'page': 'Page number', 'per_page': 'Number of entries per page'})
+@film_ns.doc(params={'page': 'Page number', 'per_page': 'Number of entries per page',
+                     'cursor': CURSOR_PARAM})
 class Films(Resource):
     """Class for implementing films get multy request"""
-    @film_ns.doc(responses={200: 'Success', 404: 'Not Found'})
+    @film_ns.doc(responses={200: 'Success', 400: 'Invalid Cursor', 404: 'Not Found'})
+    @film_cache.cached
     def get(self, page, per_page):
         """Get all records from the film table"""
+        cursor = request.args.get('cursor', default=None)
         try:
+            if cursor is not None:
+                films, next_cursor = read_films_keyset(crud=film, cursor=cursor,
+                                                       per_page=per_page)
+                logger.info('Returned the page of film table records after cursor "%s" '
+                            'with %d records per page.', cursor, per_page)
+                return films_response(films.dict(), next_cursor)
+
             films = read_films(crud=film, page=page, per_page=per_page).dict()
             logger.info('Returned the %d page of film table '
                         'records paginated with %d records per page.', page, per_page)
-            return jsonify(set_unknown_director_multy(films)['__root__'])
+            return films_response(films)
         except NotFound:
             logger.warning("No more records in film table.")
             film_ns.abort(404, message="No more records in film table.")
             return None
+        except ValueError:
+            invalid_cursor(cursor)
+            return None
+
+
+@film_ns.route('', methods=['GET'], endpoint='films_many')
+@film_ns.doc(params={'ids': IDS_PARAM})
+class FilmsMany(Resource):
+    """Class for implementing films get by ids request"""
+    @film_ns.doc(responses={200: 'Success', 400: 'Validation Error'})
+    def get(self):
+        """Get records from the film table by ids in the order of the ids"""
+        films = todo.get_many(crud=film, t_name='film')
+        for record in films['records']:
+            set_unknown_director(record)
+        return films
+
+
+@film_ns.route('/batch', methods=['PUT', 'DELETE'], endpoint='films_batch')
+class FilmsBatch(Resource):
+    """Class for implementing films batch update and delete requests"""
+
+    def batch_body(self, action: str) -> list:
+        """Check access and return the list of the batch items from the request body"""
+        if not current_user.is_authenticated:
+            logger.error('An attempt to %s films by an unauthenticated user.', action)
+            film_ns.abort(401, f'You need to be authenticated to {action} films.')
+        items = request.get_json(silent=True)
+        if not isinstance(items, list) or not 0 < len(items) <= MAX_BATCH_SIZE:
+            logger.error("Incorrect batch of films to %s received.", action)
+            film_ns.abort(400, message=f"A batch must be a list of 1 to {MAX_BATCH_SIZE} items.")
+        return items
+
+    @staticmethod
+    def batch_report(results: List[Dict[str, Any]], status: str) -> Dict[str, Any]:
+        """Build the batch report with the number of done and failed items"""
+        done = sum(result['status'] == status for result in results)
+        return {status: done, 'failed': len(results) - done, 'results': results}
+
+    @film_ns.doc(
+        description='Body is a list of objects with film_id and the fields of the film update '
+                    'model, directors and genres given as 1&2 strings or lists of ids '
+                    f'replace the film ones, at most {MAX_BATCH_SIZE} films per request',
+        responses={200: 'Batch report with the status of every film: updated, invalid, '
+                        'forbidden or not_found',
+                   400: 'Validation Error',
+                   401: 'Unauthorized'}
+    )
+    def put(self):
+        """Update records in the film table in one transaction"""
+        items = self.batch_body(action='update')
+        results = update_films(film, items, user_id=current_user.user_id, admin=is_admin())
+        report = self.batch_report(results, 'updated')
+        logger.info('Updated a batch of %d films, %d items failed.',
+                    report['updated'], report['failed'])
+        return report
+
+    @film_ns.doc(
+        description=f'Body is a list of film ids, at most {MAX_BATCH_SIZE} films per request',
+        responses={200: 'Batch report with the status of every film: deleted, '
+                        'forbidden or not_found',
+                   400: 'Validation Error',
+                   401: 'Unauthorized'}
+    )
+    def delete(self):
+        """Delete records from the film table in one transaction"""
+        ids = self.batch_body(action='delete')
+        if not all(isinstance(film_id, int) and not isinstance(film_id, bool)
+                   for film_id in ids):
+            logger.error("Incorrect ids %s of films to delete received.", ids)
+            film_ns.abort(400, message="Film ids must be integers.")
+        results = delete_films(film, ids, user_id=current_user.user_id, admin=is_admin())
+        report = self.batch_report(results, 'deleted')
+        logger.info('Deleted a batch of %d films, %d items failed.',
+                    report['deleted'], report['failed'])
+        return report
+
+
+@film_ns.route('/import', methods=['POST'], endpoint='films_import')
+class FilmsImport(Resource):
+    """Class for implementing films bulk import request"""
+    @film_ns.doc(
+        description='Body is a NDJSON (application/x-ndjson) or CSV with a header (text/csv) '
+                    'file with the fields of the film create model, one film per row',
+        responses={200: 'Import report with per-row errors',
+                   401: 'Unauthorized',
+                   415: 'Unsupported Media Type'}
+    )
+    def post(self):
+        """Create records in the film table from a NDJSON or CSV file"""
+        if not current_user.is_authenticated:
+            logger.error('An attempt to import films by an unauthenticated user.')
+            film_ns.abort(401, 'You need to be authenticated to import films')
+        file_format = IMPORT_MIMETYPES.get(request.mimetype)
+        if file_format is None:
+            logger.error("Films import with unsupported content type %s.", request.mimetype)
+            film_ns.abort(415, "Films can be imported from application/x-ndjson "
+                               "or text/csv content.")
+
+        lines = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+        report = import_films(lines, file_format, user_id=current_user.user_id)
+        logger.info('Imported %d films, %d rows failed.', report['imported'], report['failed'])
+        return report
+
+
+@film_ns.route('/export', methods=['GET'], endpoint='films_export')
+@film_ns.doc(params={'format': {'description': 'Export format, ndjson (default) or csv',
+                                'example': 'csv'}})
+class FilmsExport(Resource):
+    """Class for implementing films streaming export request"""
+    @film_ns.doc(responses={200: 'Streamed film catalogue', 400: 'Unknown Format'})
+    def get(self):
+        """Get all records from the film table as a NDJSON or CSV file streamed row by row"""
+        file_format = request.args.get('format', default='ndjson')
+        if file_format not in EXPORT_MIMETYPES:
+            logger.error("Films export in unknown format %s requested.", file_format)
+            film_ns.abort(400, message="Films can be exported in ndjson or csv format.")
+        logger.info('Started the export of film table in %s format.', file_format)
+        return Response(
+            stream_with_context(export_films(file_format)),
+            mimetype=EXPORT_MIMETYPES[file_format],
+            headers={'Content-Disposition': f'attachment; filename=films.{file_format}'})
+
+
+@film_ns.route('/count', methods=['GET'], endpoint='films_count')
+@film_ns.doc(params={'approximate': {'description': 'Return the planner estimate '
+                                                    'instead of the exact number',
+                                     'example': 'true'}})
+class FilmsCount(Resource):
+    """Class for implementing films total request"""
+    @film_ns.doc(responses={200: 'Success'})
+    def get(self):
+        """Get the total number of records in the film table, cached for a minute"""
+        return todo.count(crud=film, t_name='film')
 
 
 @film_ns.route('/<string:title>/<int:page>', methods=['GET'],
@@ -221,58 +406,93 @@ class Films(Resource):
 @film_ns.route('/<string:title>/<int:page>/<int:per_page>', methods=['GET'],
                endpoint='films_title')
 @film_ns.doc(params={'page': 'Page number', 'per_page': 'Number of entries per page',
-                     'title': "Part of the film's title"})
+                     'title': "Part of the film's title", 'cursor': CURSOR_PARAM,
+                     'order': {'description': 'Order of the found films, ignored '
+                                              'in the cursor mode',
+                               'example': 'relevance — the most similar titles first, '
+                                          'id — by film id (default)'}})
 class FilmsTitle(Resource):
     """Class for implementing films get multy by title request"""
-    @film_ns.doc(responses={200: 'Success', 404: 'Not Found'})
+    @film_ns.doc(responses={200: 'Success', 400: 'Invalid Cursor', 404: 'Not Found'})
+    @film_cache.cached
     def get(self, page, per_page, title):
         """Get all records from the film table by partial coincidence of title"""
+        cursor = request.args.get('cursor', default=None)
         try:
-            films = get_multi_by_title(film_crud=film, page=page,
-                                       per_page=per_page, title=title).dict()
+            if cursor is not None:
+                films, next_cursor = get_multi_by_title_keyset(
+                    film_crud=film, cursor=cursor, per_page=per_page, title=title)
+                logger.info('Returned the page of film table records after cursor "%s" '
+                            'with %d records per page by partial coincidence '
+                            'of the name with "%s"', cursor, per_page, title)
+                return films_response(films.dict(), next_cursor)
+
+            relevance = request.args.get('order', default='id') == 'relevance'
+            films = get_multi_by_title(film_crud=film, page=page, per_page=per_page,
+                                       title=title, relevance=relevance).dict()
             logger.info('Returned the %d page of film table '
                         'records paginated with %d records per page '
                         'by partial coincidence of the name with "%s"',
                         page, per_page, title)
-            return jsonify(set_unknown_director_multy(films)['__root__'])
+            return films_response(films)
         except NotFound:
             logger.warning("No more records corresponding to the request in film table.")
             film_ns.abort(404, message="No more records corresponding "
                                        "to the request in film table.")
             return None
+        except ValueError:
+            invalid_cursor(cursor)
+            return None
 
 
 @film_ns.route('/filter/<int:page>', methods=['GET'],
                defaults={'per_page': 10}, endpoint='films_filter_default')
 @film_ns.route('/filter/<int:page>/<int:per_page>', methods=['GET'], endpoint='films_filter')
 @film_ns.doc(params={'page': 'Page number', 'per_page': 'Number of entries per page',
-                     'release_date': {'description': 'Release year range', 'example': '2002-2020'},
+                     'release_date': {'description': 'Release year range YYYY-YYYY',
+                                      'example': '2002-2020'},
                      'directors': {'description': 'Names and surnames of directors',
                                    'example': 'Ricky_Perkins&Mark_Hunter — if several directors or'
                                               ' Ricky_Perkins — if only one director'},
                      'genres': {'description': 'Genre names',
                                 'example': 'Action&Comedy — if several genres or '
-                                           'Comedy — if only one genre'}})
+                                           'Comedy — if only one genre'},
+                     'cursor': CURSOR_PARAM})
 class FilmsFiltered(Resource):
     """Class for implementing films get multy filtered request"""
-    @film_ns.doc(responses={200: 'Success', 404: 'Not Found'})
+    @film_ns.doc(responses={200: 'Success', 400: 'Validation Error', 404: 'Not Found'})
+    @film_cache.cached
     def get(self, page, per_page):
         """Get all records from the film table filtered by genres, release date and directors"""
         data = [request.args.get('release_date', default=None),
                 request.args.get('directors', default=None),
                 request.args.get('genres', default=None)]
+        cursor = request.args.get('cursor', default=None)
         try:
+            if cursor is not None:
+                films, next_cursor = query_film_multy_filter_keyset(
+                    film_crud=film, values=data, cursor=cursor, per_page=per_page)
+                logger.info('Returned the page of film table records after cursor "%s" '
+                            'with %d records per page filtered by "%s"',
+                            cursor, per_page, str(data))
+                return films_response(films.dict(), next_cursor)
+
             films = query_film_multy_filter(film_crud=film, values=data,
                                             page=page, per_page=per_page).dict()
             logger.info('Returned the %d page of film table '
                         'records paginated with %d records per page '
                         'filtered by "%s"', page, per_page, str(data))
-            return jsonify(set_unknown_director_multy(films)['__root__'])
+            return films_response(films)
         except NotFound:
             logger.warning("No more records corresponding to the request in film table.")
             film_ns.abort(404, message="No more records corresponding "
                                        "to the request in film table.")
             return None
+        except ValueError as error:
+            logger.error("Incorrect filter arguments %s or cursor %s received. %s",
+                         str(data), cursor, error)
+            film_ns.abort(400, message=str(error))
+            return None
 
 
 @film_ns.route('/sort/<int:page>', methods=['GET'],
@@ -283,23 +503,37 @@ class FilmsFiltered(Resource):
                                       'example': 'asc — for ascending order, '
                                                  'desc — for descending'},
                      'rating': {'description': 'Sort order by rating',
-                                'example': 'asc — for ascending order, desc — for descending'}})
+                                'example': 'asc — for ascending order, desc — for descending'},
+                     'cursor': CURSOR_PARAM})
 class FilmsSorted(Resource):
     """Class for implementing films get multy sorted request"""
-    @film_ns.doc(responses={200: 'Success', 404: 'Not Found'})
+    @film_ns.doc(responses={200: 'Success', 400: 'Invalid Cursor', 404: 'Not Found'})
+    @film_cache.cached
     def get(self, page: int, per_page: int):
         """Get all records from the film table sorted by release date and rating"""
         order = [request.args.get('release_date', default=None),
                  request.args.get('rating', default=None)]
+        cursor = request.args.get('cursor', default=None)
         try:
+            if cursor is not None:
+                films, next_cursor = query_film_multy_sort_keyset(
+                    film_crud=film, order=order, cursor=cursor, per_page=per_page)
+                logger.info('Returned the page of film table records after cursor "%s" '
+                            'with %d records per page sorted by %s',
+                            cursor, per_page, str(order))
+                return films_response(films.dict(), next_cursor)
+
             films = query_film_multy_sort(film_crud=film, page=page,
                                           per_page=per_page, order=order).dict()
             logger.info('Returned the %d page of film table '
                         'records paginated with %d records per page '
                         'sorted by %s', page, per_page, str(order))
-            return jsonify(set_unknown_director_multy(films)['__root__'])
+            return films_response(films)
         except NotFound:
             logger.warning("No more records corresponding to the request in film table.")
             film_ns.abort(404, message="No more records corresponding "
                                        "to the request in film table.")
             return None
+        except ValueError:
+            invalid_cursor(cursor)
+            return None
@@ -2,7 +2,7 @@
 
 from flask_restx import Resource, fields
 from app.crud import genre
-from app.endpoints.todo import todo
+from app.endpoints.todo import IDS_PARAM, todo
 from loggers import logger
 from .namespaces import genre_ns
 
@@ -75,3 +75,13 @@ class Genres(Resource):
     def get(self, page, per_page):
         """Get all records from the genre table"""
         return todo.read_all(crud=genre, page=page, per_page=per_page, t_name='genre')
+
+
+@genre_ns.route('', methods=['GET'], endpoint='genres_many')
+@genre_ns.doc(params={'ids': IDS_PARAM})
+class GenresMany(Resource):
+    """Class for implementing genres get by ids request"""
+    @genre_ns.doc(responses={200: 'Success', 400: 'Validation Error'})
+    def get(self):
+        """Get records from the genre table by ids in the order of the ids"""
+        return todo.get_many(crud=genre, t_name='genre')
@@ -1,12 +1,21 @@
 """API namespaces module"""
 
-from flask import Blueprint
+import orjson
+from flask import Blueprint, Response
 from flask_restx import Api
 
 api_bp = Blueprint('api', __name__)
 
 api = Api(api_bp)
 
+
+@api.representation('application/json')
+def output_json(data, code: int = 200, headers=None) -> Response:
+    """Function encoding API responses with orjson, dates are written in ISO format"""
+    return Response(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS), status=code,
+                    headers=headers, mimetype='application/json')
+
+
 auth_ns = api.namespace('authentication', description='Authentication namespace')
 api.add_namespace(auth_ns, path='/auth')
 
@@ -21,3 +30,6 @@ api.add_namespace(genre_ns)
 
 user_ns = api.namespace('user', description='User namespace')
 api.add_namespace(user_ns)
+
+cache_ns = api.namespace('cache', description='Cache monitoring namespace')
+api.add_namespace(cache_ns)
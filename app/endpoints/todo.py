@@ -1,15 +1,19 @@
 """Module with class with basic methods for future endpoints"""
 import flask
-from flask import request, jsonify
+from flask import request
 from pydantic.error_wrappers import ValidationError
 from sqlalchemy.exc import DataError
 from sqlalchemy.orm.exc import UnmappedInstanceError
 from werkzeug.exceptions import NotFound
 
 from app.crud.abstract import CRUDAbstract
-from app.domain import read, create, update, delete, read_multy
+from app.domain import read, create, update, delete, read_multy, read_many, count
 from loggers import logger
-from .namespaces import api
+from .namespaces import api, output_json
+
+MAX_IDS = 100
+IDS_PARAM = {'description': f'Comma separated ids of the records, at most {MAX_IDS}',
+             'example': '1,2,3'}
 
 
 class TodoBase:
@@ -25,6 +29,24 @@ class TodoBase:
             api.abort(404, message=f"Record with id {record_id} doesn't exist.")
             return None
 
+    def get_many(self, crud: CRUDAbstract, t_name: str):
+        """Method for future get by ids request"""
+        try:
+            ids = [int(record_id) for record_id in request.args.get('ids', '').split(',')]
+        except ValueError:
+            logger.error("Incorrect ids %s of %s records received.", request.args.get('ids'),
+                         t_name)
+            api.abort(400, message="Ids must be comma separated integers.")
+            return None
+        if len(ids) > MAX_IDS:
+            logger.error("Attempt to get %d records of %s table at once.", len(ids), t_name)
+            api.abort(400, message=f"At most {MAX_IDS} records can be requested at once.")
+            return None
+
+        records, missing = read_many(crud, ids)
+        logger.info('Returned %s records with ids %s, missing %s.', t_name, ids, missing)
+        return {'records': records.dict()['__root__'], 'missing': missing}
+
     def create(self, crud: CRUDAbstract, t_name: str):
         """Method for future post request"""
         try:
@@ -78,11 +100,19 @@ class TodoBase:
             logger.info('Returned the %d page of %s table records '
                         'paginated with %d records per page.',
                         page, t_name, per_page)
-            return jsonify(records['__root__'])
+            return output_json(records['__root__'])
         except NotFound:
             logger.warning("No more records in %s table.", t_name)
             api.abort(404, message=f"No more records in {t_name} table.")
             return None
 
+    def count(self, crud: CRUDAbstract, t_name: str):
+        """Method for future get total request"""
+        approximate = request.args.get('approximate', default='false').lower() == 'true'
+        total = count(crud, approximate=approximate)
+        logger.info('Returned the %s number of records in %s table.',
+                    'approximate' if approximate else 'cached', t_name)
+        return {'total': total}
+
 
 todo = TodoBase()
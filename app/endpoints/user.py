@@ -3,7 +3,7 @@
 from flask_restx import Resource, fields
 
 from app.crud import user
-from app.endpoints.todo import todo
+from app.endpoints.todo import IDS_PARAM, todo
 from loggers import logger
 from .namespaces import user_ns
 
@@ -83,3 +83,13 @@ class Users(Resource):
     def get(self, page, per_page):
         """Get all records from the user table"""
         return todo.read_all(crud=user, page=page, per_page=per_page, t_name='user')
+
+
+@user_ns.route('', methods=['GET'], endpoint='users_many')
+@user_ns.doc(params={'ids': IDS_PARAM})
+class UsersMany(Resource):
+    """Class for implementing users get by ids request"""
+    @user_ns.doc(responses={200: 'Success', 400: 'Validation Error'})
+    def get(self):
+        """Get records from the user table by ids in the order of the ids"""
+        return todo.get_many(crud=user, t_name='user')
@@ -0,0 +1,31 @@
+"""Module making psycopg2 cooperative with gevent workers"""
+
+from typing import Optional
+
+from psycopg2 import OperationalError, extensions
+
+
+def gevent_wait_callback(connection, timeout: Optional[float] = None):
+    """
+    Function waiting for the psycopg2 connection through the gevent hub,
+    so a running query yields to other greenlets of the worker
+    """
+    from gevent.socket import wait_read, wait_write  # pylint: disable=import-outside-toplevel
+
+    while True:
+        state = connection.poll()
+        if state == extensions.POLL_OK:
+            break
+        if state == extensions.POLL_READ:
+            wait_read(connection.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(connection.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
+
+
+def make_psycopg_green():
+    """Function switching psycopg2 to the gevent wait callback in the current process"""
+    if not hasattr(extensions, 'set_wait_callback'):
+        raise ImportError("psycopg2 does not support coroutines!")
+    extensions.set_wait_callback(gevent_wait_callback)
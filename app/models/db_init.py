@@ -1,5 +1,5 @@
 """Module for database initialisation"""
 
-from flask_sqlalchemy import SQLAlchemy
+from .routing import RoutingSQLAlchemy
 
-db = SQLAlchemy()
+db = RoutingSQLAlchemy()
@@ -6,6 +6,7 @@ from .db_init import db
 class Director(db.Model):
     """Class to store directors and information about them"""
     __tablename__ = 'director'
+    __table_args__ = (db.Index('ix_director_name_surname', 'name', 'surname'),)
     director_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.VARCHAR(50), nullable=False)
     surname = db.Column(db.VARCHAR(50), nullable=False)
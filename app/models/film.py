@@ -10,11 +10,11 @@ class Film(db.Model):
     __tablename__ = 'film'
     film_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey(
-        'user.user_id', ondelete='CASCADE'), nullable=False)
+        'user.user_id', ondelete='CASCADE'), nullable=False, index=True)
     title = db.Column(db.VARCHAR(50), nullable=False, unique=True)
     poster = db.Column(db.VARCHAR(100), nullable=False)
     description = db.Column(db.Text)
-    release_date = db.Column(db.Date, nullable=False)
-    rating = db.Column(db.Float, nullable=False)
+    release_date = db.Column(db.Date, nullable=False, index=True)
+    rating = db.Column(db.Float, nullable=False, index=True)
     directors = db.relationship("Director", secondary=film_director, backref="films")
     genres = db.relationship("Genre", secondary=film_genre, backref="films")
@@ -0,0 +1,106 @@
+"""Module routing read-only queries to the database replicas"""
+
+import random
+import time
+from contextlib import contextmanager
+from typing import List
+
+from flask import has_request_context, session as flask_session
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import event, orm
+from sqlalchemy.orm import scoped_session
+
+REPLICA_BIND_PREFIX = 'replica_'
+PRIMARY_UNTIL_KEY = '_primary_until'
+
+
+class RoutingSession(SignallingSession):
+    """
+    Session sending the queries run inside replica_reads to a random replica bind.
+    Writes, reads after a write of the same session and reads of a client for
+    REPLICA_STICKY_SECONDS after its last commit go to the primary database
+    """
+
+    def __init__(self, db, **options):
+        super().__init__(db, **options)
+        self.db = db
+        self.replica_depth = 0
+        self.wrote = False
+
+    def replica_binds(self) -> List[str]:
+        """Method returning the bind keys of the configured replicas"""
+        return [key for key in self.app.config.get('SQLALCHEMY_BINDS') or {}
+                if key.startswith(REPLICA_BIND_PREFIX)]
+
+    def primary_required(self) -> bool:
+        """Method checking whether reads must see the writes of this session or client"""
+        if self.wrote or self._flushing:
+            return True
+        return has_request_context() and flask_session.get(PRIMARY_UNTIL_KEY, 0) > time.time()
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        """Method returning a replica engine for replica reads and the primary one otherwise"""
+        if self.replica_depth and not self.primary_required():
+            replicas = self.replica_binds()
+            if replicas:
+                return self.db.get_engine(self.app, bind=random.choice(replicas))
+        return super().get_bind(mapper, clause, **kwargs)
+
+    @contextmanager
+    def replica_reads(self):
+        """Context manager sending the queries run inside it to a replica"""
+        self.replica_depth += 1
+        try:
+            yield self
+        finally:
+            self.replica_depth -= 1
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def flushed(session, _):
+    """Send the following reads of the session to the primary database"""
+    session.wrote = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def executed(orm_execute_state):
+    """Send the reads following an INSERT, UPDATE or DELETE statement to the primary database"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update \
+            or orm_execute_state.is_delete:
+        orm_execute_state.session.wrote = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def committed(session):
+    """Keep the reads of the client on the primary database until replicas catch up"""
+    sticky = float(session.app.config.get('REPLICA_STICKY_SECONDS', 5))
+    if session.wrote and sticky > 0 and session.replica_binds() and has_request_context() \
+            and session.app.secret_key:
+        flask_session[PRIMARY_UNTIL_KEY] = time.time() + sticky
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """Flask-SQLAlchemy extension creating routing sessions"""
+
+    def create_session(self, options):
+        """Override SQLAlchemy method"""
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+@contextmanager
+def replica_reads(database):
+    """Context manager sending the reads of the session to a replica if it supports routing"""
+    session = database() if isinstance(database, scoped_session) else database
+    if not isinstance(session, RoutingSession):
+        yield session
+        return
+    with session.replica_reads():
+        yield session
+
+
+def init_replicas(app):
+    """Function adding the replica binds of the REPLICA_DATABASE_URIS config to the app"""
+    replicas = app.config.get('REPLICA_DATABASE_URIS') or []
+    app.config['SQLALCHEMY_BINDS'] = {
+        **(app.config.get('SQLALCHEMY_BINDS') or {}),
+        **{f'{REPLICA_BIND_PREFIX}{index}': uri for index, uri in enumerate(replicas)}}
@@ -9,7 +9,7 @@ class User(UserMixin, db.Model):
     """Class to store users and information about them"""
     __tablename__ = 'user'
     user_id = db.Column(db.Integer, primary_key=True)
-    role_id = db.Column(db.Integer, db.ForeignKey('role.role_id'), nullable=False)
+    role_id = db.Column(db.Integer, db.ForeignKey('role.role_id'), nullable=False, index=True)
     name = db.Column(db.VARCHAR(50), nullable=False)
     email = db.Column(db.VARCHAR(50), nullable=False, unique=True)
     password = db.Column(db.VARCHAR(255), nullable=False)
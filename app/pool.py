@@ -0,0 +1,89 @@
+"""Module with the database connection pool settings and metrics"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from loggers import logger
+
+
+class MeteredQueuePool(QueuePool):
+    """
+    Queue pool counting checkouts and the time spent waiting for a connection,
+    the counters are logged every stats_interval seconds
+    """
+    stats_interval: float = 60
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self.logged = time.monotonic()
+
+    def _do_get(self):
+        start = time.monotonic()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self.lock:
+                self.timeouts += 1
+            logger.warning('No database connection was available for %.1f seconds, '
+                           'the pool of %d connections and %d overflow is exhausted.',
+                           self._timeout, self.size(), self._max_overflow)
+            raise
+        waited = time.monotonic() - start
+        with self.lock:
+            self.checkouts += 1
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+            due = start - self.logged >= self.stats_interval
+            if due:
+                self.logged = start
+        if due:
+            self.log_stats()
+        return connection
+
+    def stats(self) -> Dict[str, Any]:
+        """Method returning the pool counters for monitoring"""
+        with self.lock:
+            return {'size': self.size(), 'checked_out': self.checkedout(),
+                    'overflow': self.overflow(), 'checkouts': self.checkouts,
+                    'timeouts': self.timeouts,
+                    'average_wait': self.wait_time / self.checkouts if self.checkouts else 0.0,
+                    'max_wait': self.max_wait}
+
+    def log_stats(self):
+        """Method logging the pool counters"""
+        stats = self.stats()
+        logger.info('Database pool: %d/%d connections checked out, overflow %d, '
+                    '%d checkouts waited %.4fs on average and %.4fs at most, %d timeouts.',
+                    stats['checked_out'], stats['size'], stats['overflow'],
+                    stats['checkouts'], stats['average_wait'], stats['max_wait'],
+                    stats['timeouts'])
+
+
+def init_engine_options(app):
+    """
+    Function building the engine options of the database pool from the app config,
+    options set in SQLALCHEMY_ENGINE_OPTIONS take precedence
+    """
+    MeteredQueuePool.stats_interval = float(app.config.get('DB_POOL_STATS_INTERVAL', 60))
+    options = {
+        'poolclass': MeteredQueuePool,
+        'pool_size': int(app.config.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(app.config.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(app.config.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(app.config.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': bool(app.config.get('DB_POOL_PRE_PING', True))
+    }
+    statement_timeout = int(app.config.get('DB_STATEMENT_TIMEOUT', 0))
+    if statement_timeout > 0:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **options, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
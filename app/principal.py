@@ -0,0 +1,240 @@
+"""
+Module with the cached principal of the current user, the role cache
+and the stateless signed-token authentication
+"""
+
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+from flask import current_app, request, session
+from flask_login import UserMixin
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event
+
+from app.cache import LocalSharedClient, shared_client
+from app.models import Role, User
+from app.models.db_init import db
+
+ADMIN_ROLE = 'admin'
+PRINCIPAL_KEY = '_principal'
+TOKEN_SALT = 'auth-token'
+TOKEN_FIELDS = ('user_id', 'role_id', 'role_name', 'name')
+
+
+class RoleCache:
+    """Process-wide cache of the role names by id, reloaded after ttl seconds or a role change"""
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self.names: Optional[Dict[int, str]] = None
+        self.loaded = 0.0
+        self.lock = threading.Lock()
+
+    def roles(self) -> Dict[int, str]:
+        """Method returning the role names by id, loading them with one query if needed"""
+        with self.lock:
+            if self.names is None or time.monotonic() - self.loaded >= self.ttl:
+                self.names = dict(db.session.query(Role.role_id, Role.name))
+                self.loaded = time.monotonic()
+            return self.names
+
+    def name(self, role_id: int) -> Optional[str]:
+        """Method returning the name of the role"""
+        return self.roles().get(role_id)
+
+    def invalidate(self):
+        """Method making the cache load the roles on the next read"""
+        with self.lock:
+            self.names = None
+
+
+role_cache = RoleCache()
+
+
+def invalidate_roles(*_):
+    """Reload the role cache after a role is changed"""
+    role_cache.invalidate()
+
+
+for role_event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Role, role_event, invalidate_roles)
+
+
+class UserChanges:
+    """
+    Times of the last update or deletion of the users, principals and tokens loaded
+    before it are reloaded or rejected. The markers are kept for ttl seconds in the
+    shared store of TOKEN_REVOCATION_URL, so all workers see them, or in memory
+    """
+
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+        self.store = LocalSharedClient()
+
+    def init_app(self, app):
+        """Method setting up the marker lifetime and the store from the app config"""
+        self.ttl = max(float(app.config.get('PRINCIPAL_TTL', 300)),
+                       float(app.config.get('TOKEN_TTL', 3600)))
+        self.store = shared_client(app.config.get('TOKEN_REVOCATION_URL'))
+
+    def mark(self, user_id: int):
+        """Method saving the time of a user change until the loaded principals expire"""
+        self.store.set(f'user-changed:{user_id}', repr(time.time()), ex=int(self.ttl) + 1)
+
+    def stale(self, user_id: int, loaded_at: float) -> bool:
+        """Method checking whether the user changed after the principal was loaded"""
+        changed = self.store.get(f'user-changed:{user_id}')
+        return changed is not None and float(changed) >= loaded_at
+
+
+user_changes = UserChanges()
+
+
+def mark_user_changed(_mapper, _connection, target):
+    """Make the principals of a changed or deleted user reload"""
+    user_changes.mark(target.user_id)
+
+
+for user_event in ('after_update', 'after_delete'):
+    event.listen(User, user_event, mark_user_changed)
+
+
+class Principal(UserMixin):
+    """
+    Current user kept in the signed session with the role name,
+    so authenticated requests and authorization checks need no queries
+    """
+
+    def __init__(self, user_id: int, role_id: int, role_name: Optional[str], name: str,
+                 loaded_at: float):
+        self.user_id = user_id
+        self.role_id = role_id
+        self.role_name = role_name
+        self.name = name
+        self.loaded_at = loaded_at
+
+    def get_id(self):
+        """Override UserMixin method"""
+        return self.user_id
+
+    @property
+    def is_admin(self) -> bool:
+        """Check whether the user is an administrator"""
+        return self.role_name == ADMIN_ROLE
+
+
+def make_principal(user: User) -> Principal:
+    """Function returning the principal of the user"""
+    return Principal(user_id=user.user_id, role_id=user.role_id,
+                     role_name=role_cache.name(user.role_id), name=user.name,
+                     loaded_at=time.time())
+
+
+def store_principal(user: User) -> Principal:
+    """Function saving the principal of the user in the session"""
+    principal = make_principal(user)
+    session[PRINCIPAL_KEY] = vars(principal)
+    return principal
+
+
+def load_principal(user_id) -> Optional[Principal]:
+    """
+    Function returning the principal of the session user, the user is loaded
+    from the database only when the principal is older than PRINCIPAL_TTL seconds
+    or the user was changed after the principal was loaded
+    """
+    data = session.get(PRINCIPAL_KEY)
+    if data is not None and data['user_id'] == int(user_id) and \
+            time.time() - data['loaded_at'] < float(current_app.config.get('PRINCIPAL_TTL', 300)) \
+            and not user_changes.stale(data['user_id'], data['loaded_at']):
+        return Principal(**data)
+    user = User.query.get(int(user_id))
+    if user is None:
+        session.pop(PRINCIPAL_KEY, None)
+        return None
+    return store_principal(user)
+
+
+def init_role_cache(app):
+    """Function setting up the role cache and the user change markers from the app config"""
+    role_cache.ttl = float(app.config.get('ROLE_CACHE_TTL', 300))
+    role_cache.invalidate()
+    user_changes.init_app(app)
+
+
+class TokenAuth:
+    """
+    Signed expiring tokens carrying the principal of the user, they are checked
+    without database queries against a revocation list kept in memory
+    or in the shared store of TOKEN_REVOCATION_URL
+    """
+
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+        self.revoked = None
+
+    def init_app(self, app):
+        """Method setting up the token lifetime and the revocation list from the app config"""
+        self.ttl = float(app.config.get('TOKEN_TTL', 3600))
+        self.revoked = shared_client(app.config.get('TOKEN_REVOCATION_URL'))
+
+    @staticmethod
+    def serializer() -> URLSafeTimedSerializer:
+        """Method returning the serializer signing the tokens with the app secret key"""
+        return URLSafeTimedSerializer(current_app.secret_key, salt=TOKEN_SALT)
+
+    def issue(self, principal: Principal) -> str:
+        """Method returning a new token of the principal"""
+        return self.serializer().dumps({**{field: getattr(principal, field)
+                                           for field in TOKEN_FIELDS},
+                                        'loaded_at': principal.loaded_at,
+                                        'jti': uuid.uuid4().hex})
+
+    def verify(self, token: str) -> Optional[Dict]:
+        """Method returning the token data if the token is valid, unexpired and not revoked"""
+        try:
+            data, issued = self.serializer().loads(token, max_age=self.ttl,
+                                                   return_timestamp=True)
+        except BadSignature:
+            return None
+        if self.revoked.get(f'revoked-token:{data["jti"]}') is not None:
+            return None
+        return {**data, 'issued': issued.timestamp()}
+
+    def load(self, token: str) -> Optional[Principal]:
+        """Method returning the principal of a valid token issued after the last user change"""
+        data = self.verify(token)
+        if data is None:
+            return None
+        loaded_at = data.get('loaded_at', data['issued'])
+        if user_changes.stale(data['user_id'], loaded_at):
+            return None
+        return Principal(**{field: data[field] for field in TOKEN_FIELDS}, loaded_at=loaded_at)
+
+    def revoke(self, token: str) -> bool:
+        """Method adding a valid token to the revocation list until it expires"""
+        data = self.verify(token)
+        if data is None:
+            return False
+        remaining = data['issued'] + self.ttl - time.time()
+        self.revoked.set(f'revoked-token:{data["jti"]}', 1, ex=max(int(remaining) + 1, 1))
+        return True
+
+
+token_auth = TokenAuth()
+
+
+def request_token() -> Optional[str]:
+    """Function returning the bearer token of the request"""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    return token.strip()
+
+
+def load_token_principal(_request) -> Optional[Principal]:
+    """Function returning the principal of the request bearer token"""
+    token = request_token()
+    return None if token is None else token_auth.load(token)
@@ -0,0 +1,51 @@
+"""Module with the fast serializer of trusted ORM rows into pydantic schemas"""
+
+from functools import lru_cache
+from operator import getitem
+from typing import Any, Callable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON
+
+RowSerializer = Callable[[Any], BaseModel]
+
+
+def nested_schema(field) -> Optional[Type[BaseModel]]:
+    """Function returning the schema of a nested (singular or list) schema field"""
+    if field.shape in (SHAPE_SINGLETON, SHAPE_LIST) and isinstance(field.type_, type) \
+            and issubclass(field.type_, BaseModel):
+        return field.type_
+    return None
+
+
+@lru_cache(maxsize=None)
+def row_serializer(schema: Type[BaseModel], mapping: bool = False) -> RowSerializer:
+    """
+    Function returning a callable that builds the schema object from an ORM row
+    (or from a mapping of the field values) with `construct`, so validators are skipped.
+    Only rows read from the database may be passed, they were validated when written
+    """
+    plan: List[Tuple[str, Optional[RowSerializer], bool]] = []
+    for name, field in schema.__fields__.items():
+        nested = nested_schema(field)
+        plan.append((name, nested and row_serializer(nested, mapping),
+                     field.shape == SHAPE_LIST))
+    get_value = getitem if mapping else getattr
+
+    def serialize(row: Any) -> BaseModel:
+        values = {}
+        for name, nested, many in plan:
+            value = get_value(row, name)
+            if nested is not None and value is not None:
+                value = [nested(item) for item in value] if many else nested(value)
+            values[name] = value
+        return schema.construct(**values)
+
+    return serialize
+
+
+def serialize_rows(list_schema: Type[BaseModel], schema: Type[BaseModel],
+                   rows: List[Any], mapping: bool = False) -> BaseModel:
+    """Function building the list schema object from trusted ORM rows without validation"""
+    serialize = row_serializer(schema, mapping)
+    return list_schema.construct(__root__=[serialize(row) for row in rows])
@@ -0,0 +1 @@
+"""Benchmarks module __init__"""
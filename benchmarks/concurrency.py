@@ -0,0 +1,95 @@
+"""
+Load test of the gunicorn configuration. Every worker model is started with
+gunicorn.conf.py and receives concurrent requests of an app running a slow
+PostgreSQL query, the throughput must grow with the number of workers and
+with gevent. Run with `DATABASE_URL=... python -m benchmarks.concurrency
+[requests] [concurrency] [query seconds]`, pass `BENCHMARK_APP=wsgi:app` and
+`BENCHMARK_PATH=/api/film/all/1` to load the film library instead
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+HOST = '127.0.0.1'
+PORT = 8765
+WORKER_MODELS = (('sync', 1), ('sync', 4), ('gevent', 1), ('gevent', 4))
+
+
+def slow_app(environ, start_response):
+    """WSGI app answering after a pg_sleep query of BENCHMARK_QUERY_SECONDS"""
+    with psycopg2.connect(os.environ['DATABASE_URL']) as connection:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_sleep(%s)',
+                           (float(os.getenv('BENCHMARK_QUERY_SECONDS', '0.1')),))
+    connection.close()
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'OK']
+
+
+def start_server(worker_class: str, workers: int) -> subprocess.Popen:
+    """Function starting gunicorn with the worker model and waiting until it accepts requests"""
+    env = {**os.environ, 'GUNICORN_WORKER_CLASS': worker_class,
+           'GUNICORN_WORKERS': str(workers), 'GUNICORN_LOG_LEVEL': 'warning'}
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+         '--bind', f'{HOST}:{PORT}',
+         os.getenv('BENCHMARK_APP', 'benchmarks.concurrency:slow_app')], env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, PORT), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"Gunicorn with {workers} {worker_class} workers did not start!")
+
+
+def fetch(url: str) -> int:
+    """Function requesting the url and returning the status code"""
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return response.status
+
+
+def throughput(number: int, concurrency: int) -> float:
+    """Function returning the number of requests per second served at the concurrency"""
+    url = f'http://{HOST}:{PORT}{os.getenv("BENCHMARK_PATH", "/")}'
+    fetch(url)
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        statuses = list(executor.map(fetch, [url] * number))
+    elapsed = time.monotonic() - start
+    assert all(status == 200 for status in statuses)
+    return number / elapsed
+
+
+def main(number: int = 200, concurrency: int = 20, query_seconds: float = 0.1):
+    """Function printing the throughput of every worker model and checking that it scales"""
+    os.environ['BENCHMARK_QUERY_SECONDS'] = str(query_seconds)
+    print(f'{"worker":<10}{"workers":>8}{"requests/s":>12}{"speedup":>10}')
+    results = {}
+    for worker_class, workers in WORKER_MODELS:
+        server = start_server(worker_class, workers)
+        try:
+            results[worker_class, workers] = throughput(number, concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+        speedup = results[worker_class, workers] / results['sync', 1]
+        print(f'{worker_class:<10}{workers:>8}{results[worker_class, workers]:>12.1f}'
+              f'{speedup:>9.1f}x')
+
+    if not results['sync', 1] < results['sync', 4] < results['gevent', 4] \
+            or results['gevent', 1] <= results['sync', 1]:
+        sys.exit("The throughput does not scale with the workers!")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]), *(float(arg) for arg in sys.argv[3:4]))
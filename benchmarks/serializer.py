@@ -0,0 +1,66 @@
+"""
+Benchmark of the per-row cost of serialising ORM rows with pydantic validation
+(`from_orm`) and with the trusted row serializer. Run with
+`python -m benchmarks.serializer [rows] [repeat]`
+"""
+
+import sys
+import timeit
+from datetime import date
+
+from app.models import Director, Film, Genre, User
+from app.schemas import DirectorBase, DirectorList, FilmBase, FilmList, GenreBase, GenreList, \
+    UserBase, UserList
+from app.schemas.serializer import serialize_rows
+
+
+def film_rows(number: int) -> list:
+    """Function creating transient film rows with two genres and two directors"""
+    genres = [Genre(genre_name='Action'), Genre(genre_name='Comedy')]
+    directors = [Director(name='Deanna', surname='Craig'), Director(name='Michaela', surname='Ruiz')]
+    rows = []
+    for index in range(number):
+        row = Film(title=f'Peaky Blinders {index}',
+                   poster='https://www.posters.net/Peaky-Blinders-poster',
+                   release_date=date(2013, 9, 12), rating=9.5, user_id=1)
+        row.genres = genres
+        row.directors = directors
+        rows.append(row)
+    return rows
+
+
+CASES = {
+    'film': (FilmBase, FilmList, film_rows),
+    'genre': (GenreBase, GenreList, lambda number: [Genre(genre_name='Action')] * number),
+    'director': (DirectorBase, DirectorList,
+                 lambda number: [Director(name='Deanna', surname='Craig')] * number),
+    'user': (UserBase, UserList,
+             lambda number: [User(name='Deanna', email='deanna@gmail.com', role_id=1,
+                                   password='password')] * number)
+}
+
+
+def validated(schema, list_schema, rows) -> list:
+    """Function serialising rows the way the list endpoints did before"""
+    return list_schema.from_orm([schema.from_orm(row) for row in rows]).dict()['__root__']
+
+
+def trusted(schema, list_schema, rows) -> list:
+    """Function serialising rows with the trusted row serializer"""
+    return serialize_rows(list_schema, schema, rows).dict()['__root__']
+
+
+def main(number: int = 1000, repeat: int = 5):
+    """Function printing the best per-row time of both serialisers for every schema"""
+    print(f'{"schema":<10}{"from_orm, us":>15}{"trusted, us":>15}{"speedup":>10}')
+    for name, (schema, list_schema, make_rows) in CASES.items():
+        rows = make_rows(number)
+        assert validated(schema, list_schema, rows) == trusted(schema, list_schema, rows)
+        times = [min(timeit.repeat(lambda func=func: func(schema, list_schema, rows),
+                                   number=1, repeat=repeat)) / number * 10 ** 6
+                 for func in (validated, trusted)]
+        print(f'{name:<10}{times[0]:>15.2f}{times[1]:>15.2f}{times[0] / times[1]:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
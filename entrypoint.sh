@@ -1,3 +1,3 @@
 #!/usr/bin/env bash
 flask db upgrade
-gunicorn --bind 0.0.0.0:8000 wsgi:app
+gunicorn --config gunicorn.conf.py wsgi:app
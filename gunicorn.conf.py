@@ -0,0 +1,40 @@
+"""
+Gunicorn production server configuration, every setting can be overridden
+with a GUNICORN_* environment variable
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# gevent workers serve other requests while a PostgreSQL query is running,
+# `sync` is the single request per worker fallback
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.getenv('GUNICORN_WORKERS', str(multiprocessing.cpu_count() * 2 + 1)))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '100'))
+
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+
+# Workers are recycled after a jittered number of requests to bound memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+# The app is loaded by every worker after gevent patched it, so no database
+# connection is shared between processes
+preload_app = False
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_worker_init(worker):
+    """Hook making psycopg2 wait for queries through the gevent hub in gevent workers"""
+    if 'gevent' in worker.cfg.worker_class_str:
+        from app.green import make_psycopg_green  # pylint: disable=import-outside-toplevel
+
+        make_psycopg_green()
+        worker.log.info('psycopg2 is patched for gevent.')
@@ -26,6 +26,15 @@ config.set_main_option(
         '%', '%%'))
 target_metadata = current_app.extensions['migrate'].db.metadata
 
+# indexes created only by migrations, because they need a PostgreSQL extension
+# that the models don't require, autogenerate must not drop them
+MIGRATION_ONLY_INDEXES = {'ix_film_title_trgm'}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave the indexes created only by migrations out of autogenerate"""
+    return not (type_ == 'index' and reflected and name in MIGRATION_ONLY_INDEXES)
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -46,7 +55,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        compare_type=True, url=url, target_metadata=target_metadata, literal_binds=True
+        compare_type=True, url=url, target_metadata=target_metadata, literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -78,6 +88,7 @@ def run_migrations_online():
             compare_type=True,
             connection=connection,
             target_metadata=target_metadata,
+            include_object=include_object,
             process_revision_directives=process_revision_directives,
             **current_app.extensions['migrate'].configure_args
         )
@@ -0,0 +1,27 @@
+"""trigram index for film title search
+
+Revision ID: 5f1c2a9d7e34
+Revises: 26cbdfdc1bdd
+Create Date: 2026-10-18 10:12:41.218305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f1c2a9d7e34'
+down_revision = '26cbdfdc1bdd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_film_title_trgm', 'film', ['title'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_film_title_trgm', table_name='film')
+    op.execute('DROP EXTENSION IF EXISTS pg_trgm')
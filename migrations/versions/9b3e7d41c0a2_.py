@@ -0,0 +1,36 @@
+"""indexes for film filter and sort columns
+
+Revision ID: 9b3e7d41c0a2
+Revises: 5f1c2a9d7e34
+Create Date: 2026-10-18 11:03:17.540912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b3e7d41c0a2'
+down_revision = '5f1c2a9d7e34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_film_release_date'), 'film', ['release_date'], unique=False)
+    op.create_index(op.f('ix_film_rating'), 'film', ['rating'], unique=False)
+    op.create_index(op.f('ix_film_user_id'), 'film', ['user_id'], unique=False)
+    op.create_index('ix_film_genre_genre_id_film_id', 'film_genre',
+                    ['genre_id', 'film_id'], unique=False)
+    op.create_index('ix_film_director_director_id_film_id', 'film_director',
+                    ['director_id', 'film_id'], unique=False)
+    op.create_index(op.f('ix_user_role_id'), 'user', ['role_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_user_role_id'), table_name='user')
+    op.drop_index('ix_film_director_director_id_film_id', table_name='film_director')
+    op.drop_index('ix_film_genre_genre_id_film_id', table_name='film_genre')
+    op.drop_index(op.f('ix_film_user_id'), table_name='film')
+    op.drop_index(op.f('ix_film_rating'), table_name='film')
+    op.drop_index(op.f('ix_film_release_date'), table_name='film')
@@ -0,0 +1,24 @@
+"""composite index for director name lookups
+
+Revision ID: c4a8f2e61b57
+Revises: 9b3e7d41c0a2
+Create Date: 2026-10-18 11:48:05.127733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a8f2e61b57'
+down_revision = '9b3e7d41c0a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_director_name_surname', 'director', ['name', 'surname'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_director_name_surname', table_name='director')
@@ -1,9 +1,11 @@
 """Fixtures for testing"""
 
+from contextlib import contextmanager
 from datetime import datetime
 
 from faker import Faker
 import pytest
+from sqlalchemy import event
 
 from app import create_app, User
 from app.models import Role, Director, Genre, Film
@@ -11,6 +13,25 @@ from app.models.db_init import db
 from tests.config import Config
 
 
+@contextmanager
+def count_statements(engine=None, parameters: bool = False):
+    """
+    Context manager collecting the statements sent to the engine (the default one
+    if it is not given), with their parameters if parameters is set
+    """
+    engine = engine or db.engine
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, statement_parameters, *args):
+        statements.append((statement, statement_parameters) if parameters else statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
 @pytest.fixture(scope="function", autouse=True)
 def flask_app():
     """Fixture with test client"""
@@ -2,6 +2,11 @@
 
 from flask import url_for
 
+from app import db
+from app.models import User
+from app.principal import token_auth
+from tests.conftest import count_statements
+
 
 def test_auth_no_user(app_with_db):
     """
@@ -113,3 +118,113 @@ def test_logout_bad(app_with_data):
 
     # then
     assert response.status_code == 401
+
+
+def test_auth_principal_queries(app_with_data):
+    """Checking that authenticated requests load neither the user nor the roles"""
+    app_with_data.post(
+        url_for("api.authentication_login"),
+        json={
+            "email": "john@gmail.com",
+            "password": "Johny5863"
+        }
+    )
+    with count_statements() as statements:
+        response = app_with_data.put(url_for("api.film", film_id=5),
+                                     json={"description": "Super film."})
+
+    assert response.status_code == 200
+    assert not [statement for statement in statements
+                if 'FROM role' in statement or 'FROM "user"' in statement]
+
+
+def test_auth_principal_user_changed(app_with_data):
+    """Checking that a role change and a deletion of the user apply to its session at once"""
+    app_with_data.post(
+        url_for("api.authentication_login"),
+        json={
+            "email": "john@gmail.com",
+            "password": "Johny5863"
+        }
+    )
+    db.session.query(User).get(11).role_id = 1
+    db.session.commit()
+    response = app_with_data.put(url_for("api.film", film_id=5),
+                                 json={"description": "Super film."})
+    assert response.status_code == 403
+
+    db.session.delete(db.session.query(User).get(11))
+    db.session.commit()
+    response = app_with_data.put(url_for("api.film", film_id=5),
+                                 json={"description": "Super film."})
+    assert response.status_code == 401
+
+
+def login_token(client):
+    """Function returning the authorization header with a new token of the administrator"""
+    response = client.post(
+        url_for("api.authentication_login"),
+        json={
+            "email": "john@gmail.com",
+            "password": "Johny5863",
+            "token": True
+        }
+    )
+    assert response.status_code == 200
+    assert response.json["token_type"] == "Bearer"
+    return {"Authorization": f"Bearer {response.json['token']}"}
+
+
+def test_auth_token(app_with_data):
+    """Checking that a token authenticates requests without any user or role queries"""
+    headers = login_token(app_with_data)
+    with count_statements() as statements:
+        response = app_with_data.put(url_for("api.film", film_id=5), headers=headers,
+                                     json={"description": "Super film."})
+
+    assert response.status_code == 200
+    assert not [statement for statement in statements
+                if 'FROM role' in statement or 'FROM "user"' in statement]
+
+
+def test_auth_token_user_changed(app_with_data):
+    """Checking that the tokens issued before a change of the user stop working"""
+    headers = login_token(app_with_data)
+    db.session.query(User).get(11).name = "Johny"
+    db.session.commit()
+    response = app_with_data.put(url_for("api.film", film_id=5), headers=headers,
+                                 json={"description": "Super film."})
+    assert response.status_code == 401
+
+    headers = login_token(app_with_data)
+    response = app_with_data.put(url_for("api.film", film_id=5), headers=headers,
+                                 json={"description": "Super film."})
+    assert response.status_code == 200
+
+
+def test_auth_token_revoked(app_with_data):
+    """Checking that a token stops working after the logout"""
+    headers = login_token(app_with_data)
+    response = app_with_data.get(url_for("api.authentication_logout"), headers=headers)
+    assert response.status_code == 200
+
+    response = app_with_data.put(url_for("api.film", film_id=5), headers=headers,
+                                 json={"description": "Super film."})
+    assert response.status_code == 401
+
+
+def test_auth_token_invalid(app_with_data):
+    """Checking that tampered and expired tokens are rejected"""
+    headers = login_token(app_with_data)
+    tampered = {"Authorization": headers["Authorization"][:-2] + "xx"}
+    response = app_with_data.put(url_for("api.film", film_id=5), headers=tampered,
+                                 json={"description": "Super film."})
+    assert response.status_code == 401
+
+    token_auth.ttl = -1
+    try:
+        response = app_with_data.put(url_for("api.film", film_id=5), headers=headers,
+                                     json={"description": "Super film."})
+    finally:
+        token_auth.ttl = 3600
+    assert response.status_code == 401
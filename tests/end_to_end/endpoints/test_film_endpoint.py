@@ -1,9 +1,15 @@
 """Testing film's routes"""
 
+import csv
+import io
+import json
+
 from flask import url_for
 import pytest
 
 from app import db
+from app.bulk import INVALID_ENCODING
+from app.crud.pagination import encode_cursor
 from app.domain import set_unknown_director
 from app.models import Film
 from app.schemas import FilmBase
@@ -105,6 +111,18 @@ def test_create_film_no_auth(app_with_data, data):
             "genres": "4"
         },
          400
+        ),
+        ({
+            "title": "Jacky",
+            "poster": "https://www.posters.net/Peaky-Blinders-poster",
+            "description": "A gangster family epic set in 1900s England.",
+            "release_date": "2013-09-12",
+            "rating": 9.5,
+            "user_id": 4,
+            "directors": "1&100",
+            "genres": "4"
+        },
+         400
         )
     ]
 )
@@ -181,6 +199,7 @@ def test_get_film_by_id(app_with_data, film_id, code):
     if code == 200:
         data = response.json
         record = FilmBase.from_orm(db.session.query(Film).get(film_id)).dict()
+        record['release_date'] = record['release_date'].isoformat()
         assert data == set_unknown_director(record)
 
 
@@ -264,6 +283,7 @@ def test_update_film_by_id_auth(app_with_data, film_id, data, code):
     assert response.status_code == code
     if code == 200:
         record = FilmBase.from_orm(db.session.query(Film).get(film_id)).dict()
+        record['release_date'] = record['release_date'].isoformat()
 
         data = response.json
         assert data == set_unknown_director(record)
@@ -453,3 +473,304 @@ def test_del_film_by_id_auth(app_with_data, film_id, code):
     app_with_data.get(
         url_for("api.authentication_logout")
     )
+
+
+def walk_cursor_pages(client, endpoint, per_page, **kwargs):
+    """Function collecting film titles by following the next page cursors"""
+    titles = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get(
+            url_for(endpoint, page=1, per_page=per_page, cursor=cursor, **kwargs)
+        )
+        assert response.status_code == 200
+        assert len(response.json) <= per_page
+        titles.extend(item['title'] for item in response.json)
+        cursor = response.headers.get('X-Next-Cursor')
+    return titles
+
+
+@pytest.mark.parametrize("per_page", [1, 2, 5])
+def test_get_all_films_cursor(app_with_data, per_page):
+    """Checks that following the cursors returns every film once in id order"""
+    titles = walk_cursor_pages(app_with_data, "api.films", per_page)
+    expected = [item.title for item in db.session.query(Film).order_by(Film.film_id).all()]
+    assert titles == expected
+
+
+@pytest.mark.parametrize(
+    "args, order_by",
+    [({'release_date': 'asc'}, [Film.release_date.asc()]),
+     ({'rating': 'desc'}, [Film.rating.desc()]),
+     ({'release_date': 'desc', 'rating': 'asc'}, [Film.release_date.desc(), Film.rating.asc()])])
+def test_get_all_films_sorted_cursor(app_with_data, args, order_by):
+    """Checks the order of films received by following the cursors of the sorted list"""
+    titles = walk_cursor_pages(app_with_data, "api.films_sort", 2, **args)
+    expected = [item.title for item in
+                db.session.query(Film).order_by(*order_by, Film.film_id).all()]
+    assert titles == expected
+
+
+@pytest.mark.parametrize(
+    "args, count",
+    [({'genres': 'Action&Drama'}, 4), ({'directors': 'Jack_Jackson'}, 3)])
+def test_get_all_films_filtered_cursor(app_with_data, args, count):
+    """Checks the number of filtered films received by following the cursors"""
+    titles = walk_cursor_pages(app_with_data, "api.films_filter", 1, **args)
+    assert len(titles) == len(set(titles)) == count
+
+
+def test_get_all_films_by_title_cursor(app_with_data):
+    """Checks the films found by title received by following the cursors"""
+    titles = walk_cursor_pages(app_with_data, "api.films_title", 1, title="Mar")
+    assert titles == ["Mary Johnson", "Mark per million"]
+
+
+@pytest.mark.parametrize(
+    "endpoint, args, cursor",
+    [("api.films", {}, "not-a-cursor"),
+     ("api.films", {}, encode_cursor(["abc"])),
+     ("api.films", {}, encode_cursor([1.5])),
+     ("api.films_sort", {'rating': 'desc'}, encode_cursor(["high", 1])),
+     ("api.films_sort", {'release_date': 'asc'}, encode_cursor([20200101, 1]))])
+def test_get_all_films_invalid_cursor(app_with_data, endpoint, args, cursor):
+    """Checks the status code for a damaged or wrongly typed cursor"""
+    response = app_with_data.get(
+        url_for(endpoint, page=1, per_page=2, cursor=cursor, **args)
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("approximate", ['false', 'true'])
+def test_get_films_count(app_with_data, approximate):
+    """Checks the status code and the total number of films"""
+    # when
+    response = app_with_data.get(url_for("api.films_count", approximate=approximate))
+
+    # then
+    assert response.status_code == 200
+    assert response.json['total'] >= 0
+
+
+@pytest.mark.parametrize("order", ['relevance', 'id'])
+def test_get_all_films_by_title_order(app_with_data, order):
+    """Checks the number of records received with the search order"""
+    response = app_with_data.get(
+        url_for("api.films_title_default", title="Mar", page=1, order=order)
+    )
+    check_count(response, 200, 2)
+
+
+@pytest.mark.parametrize(
+    "release_date, code", [("2001-2020", 200), ("2020-2001", 400), ("2001", 400)])
+def test_get_all_films_filtered_release_date(app_with_data, release_date, code):
+    """Checks the validation of the release years range"""
+    response = app_with_data.get(
+        url_for("api.films_filter_default", page=1, release_date=release_date)
+    )
+    assert response.status_code == code
+
+
+@pytest.mark.parametrize(
+    "content_type, body, imported, errors",
+    [
+        ("application/x-ndjson",
+         '{"title": "Imported", "poster": "https://www.posters.net/poster", '
+         '"release_date": "2013-09-12", "rating": 9.5, "directors": "1&2", "genres": [1]}\n'
+         'not json\n'
+         '{"title": "Winner", "poster": "https://www.posters.net/poster", '
+         '"release_date": "2013-09-12", "rating": 9.5}\n',
+         1, [2, 3]),
+        ("text/csv",
+         "title,poster,description,release_date,rating,directors,genres\n"
+         "Imported,https://www.posters.net/poster,,2013-09-12,9.5,1&2,1\n"
+         "Imported two,https://www.posters.net/poster,Text,2013-09-12,11,,\n"
+         "Imported three,https://www.posters.net/poster,Text,2013-09-12,5,,\n",
+         2, [3])
+    ])
+def test_import_films(app_with_data, content_type, body, imported, errors):
+    """Checking the import report and the imported films"""
+    app_with_data.post(
+        url_for("api.authentication_login"),
+        json={
+            "email": "john@gmail.com",
+            "password": "Johny5863"
+        }
+    )
+    response = app_with_data.post(url_for("api.films_import"), data=body,
+                                  content_type=content_type)
+
+    assert response.status_code == 200
+    assert response.json['imported'] == imported
+    assert [error['line'] for error in response.json['errors']] == errors
+    record = db.session.query(Film).filter_by(title="Imported").one()
+    assert record.user_id == 11 and len(record.directors) == 2
+
+
+@pytest.mark.parametrize("content_type", ["application/x-ndjson", "text/csv"])
+def test_import_films_invalid_encoding(app_with_data, content_type):
+    """Checking that a file which is not valid UTF-8 is reported as a row error"""
+    app_with_data.post(
+        url_for("api.authentication_login"),
+        json={
+            "email": "john@gmail.com",
+            "password": "Johny5863"
+        }
+    )
+    response = app_with_data.post(url_for("api.films_import"), data=b'\xff\xfe\xfa\n',
+                                  content_type=content_type)
+
+    assert response.status_code == 200
+    assert response.json['imported'] == 0
+    assert response.json['errors'] == [{'line': 1, 'error': INVALID_ENCODING}]
+
+
+@pytest.mark.parametrize("login, content_type, code",
+                         [(False, "text/csv", 401), (True, "application/json", 415)])
+def test_import_films_rejected(app_with_data, login, content_type, code):
+    """Checking that imports by anonymous users or with other content types are rejected"""
+    if login:
+        app_with_data.post(
+            url_for("api.authentication_login"),
+            json={
+                "email": "john@gmail.com",
+                "password": "Johny5863"
+            }
+        )
+    response = app_with_data.post(url_for("api.films_import"), data="[]",
+                                  content_type=content_type)
+    assert response.status_code == code
+
+
+def test_export_films_ndjson(app_with_data):
+    """Checking that the NDJSON export contains all films with their relations"""
+    response = app_with_data.get(url_for("api.films_export"))
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [record["film_id"] for record in records] == [1, 2, 3, 4, 5]
+    assert records[1]["directors"] == [11, 12] and records[1]["genres"] == [1, 2]
+    assert records[4]["directors"] == [] and records[0]["release_date"] == \
+        db.session.query(Film).get(1).release_date.isoformat()
+
+
+def test_export_films_csv(app_with_data):
+    """Checking that the CSV export can be imported back"""
+    response = app_with_data.get(url_for("api.films_export", format="csv"))
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 5 and rows[1]["directors"] == "11&12"
+
+    db.session.execute("TRUNCATE film CASCADE;")
+    db.session.commit()
+    app_with_data.post(
+        url_for("api.authentication_login"),
+        json={
+            "email": "john@gmail.com",
+            "password": "Johny5863"
+        }
+    )
+    response = app_with_data.post(url_for("api.films_import"),
+                                  data=response.get_data(as_text=True), content_type="text/csv")
+    assert response.json["imported"] == 5
+    assert db.session.query(Film).filter_by(title="On the other side").one().genres
+
+
+def test_export_films_unknown_format(app_with_data):
+    """Checking that an unknown export format is rejected"""
+    response = app_with_data.get(url_for("api.films_export", format="xml"))
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "ids, code, titles, missing",
+    [
+        ("5,1", 200, ["Winner", "Mary Johnson"], []),
+        ("2,77", 200, ["On the other side"], [77]),
+        ("1,a", 400, None, None),
+        ("", 400, None, None),
+        (",".join(map(str, range(101))), 400, None, None)
+    ])
+def test_get_films_by_ids(app_with_data, ids, code, titles, missing):
+    """Checking films returned by ids in the request order"""
+    response = app_with_data.get(url_for("api.films_many", ids=ids))
+
+    assert response.status_code == code
+    if code == 200:
+        assert [record["title"] for record in response.json["records"]] == titles
+        assert response.json["missing"] == missing
+        assert (response.json["records"][0]["directors"] == "UNKNOWN") == \
+            (titles[0] == "Winner")
+
+
+@pytest.mark.parametrize(
+    "email, password, statuses",
+    [
+        ("john@gmail.com", "Johny5863", ["updated", "invalid", "not_found"]),
+        ("jacky@gmail.com", "Jacky", ["forbidden", "forbidden", "not_found"])
+    ])
+def test_update_films_batch(app_with_data, email, password, statuses):
+    """Checking the per-item statuses of a batch update by an administrator and a user"""
+    app_with_data.post(
+        url_for("api.authentication_login"),
+        json={
+            "email": email,
+            "password": password
+        }
+    )
+    response = app_with_data.put(url_for("api.films_batch"), json=[
+        {"film_id": 1, "description": "Super film.", "directors": "1&2"},
+        {"film_id": 2, "poster": "poster"},
+        {"film_id": 25, "rating": 5}
+    ])
+
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json["results"]] == statuses
+    assert response.json["updated"] == statuses.count("updated")
+    assert (db.session.query(Film).get(1).description == "Super film.") == \
+        (statuses[0] == "updated")
+
+
+@pytest.mark.parametrize(
+    "email, password, deleted",
+    [("john@gmail.com", "Johny5863", 2), ("jacky@gmail.com", "Jacky", 0)])
+def test_delete_films_batch(app_with_data, email, password, deleted):
+    """Checking that a batch delete removes only the films the user may change"""
+    app_with_data.post(
+        url_for("api.authentication_login"),
+        json={
+            "email": email,
+            "password": password
+        }
+    )
+    response = app_with_data.delete(url_for("api.films_batch"), json=[4, 5, 25])
+
+    assert response.status_code == 200
+    assert response.json["deleted"] == deleted
+    assert response.json["results"][2] == {"film_id": 25, "status": "not_found"}
+    assert db.session.query(Film).count() == 5 - deleted
+
+
+@pytest.mark.parametrize(
+    "login, method, body, code",
+    [
+        (False, "put", [{"film_id": 1, "rating": 5}], 401),
+        (False, "delete", [1], 401),
+        (True, "put", {"film_id": 1}, 400),
+        (True, "delete", [], 400),
+        (True, "delete", ["1"], 400)
+    ])
+def test_films_batch_rejected(app_with_data, login, method, body, code):
+    """Checking that batches of anonymous users or with incorrect bodies are rejected"""
+    if login:
+        app_with_data.post(
+            url_for("api.authentication_login"),
+            json={
+                "email": "john@gmail.com",
+                "password": "Johny5863"
+            }
+        )
+    response = getattr(app_with_data, method)(url_for("api.films_batch"), json=body)
+    assert response.status_code == code
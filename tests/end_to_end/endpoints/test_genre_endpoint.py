@@ -127,3 +127,15 @@ def test_del_genre_by_id(app_with_data, genre_id, code):
 
     # then
     assert response.status_code == code
+
+
+def test_get_genres_by_ids(app_with_data):
+    """Checking genres returned by ids in the request order"""
+    response = app_with_data.get(url_for("api.genres_many", ids="3,1,9"))
+
+    assert response.status_code == 200
+    assert response.json == {
+        "records": [GenreBase.from_orm(db.session.query(Genre).get(genre_id)).dict()
+                    for genre_id in (3, 1)],
+        "missing": [9]
+    }
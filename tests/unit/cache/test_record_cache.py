@@ -0,0 +1,50 @@
+"""Testing record cache"""
+
+from flask import url_for
+
+from app import db
+from app.cache import LocalSharedClient, SharedCache
+from app.crud import genre
+from app.models import Genre
+
+
+def test_cached_record(app_with_data):
+    """Checking that a repeated read of a record is served from the cache"""
+    first = genre.get(record_id=1)
+    db.session.query(Genre).filter(Genre.genre_id == 1).update({'genre_name': 'Comedy'})
+    db.session.commit()
+    second = genre.get(record_id=1)
+    assert first == second
+    assert genre.cache.stats() == {'enabled': True, 'hits': 1, 'misses': 1}
+
+
+def test_cached_record_invalidation(app_with_data):
+    """Checking that an update makes the cached record stale"""
+    genre.get(record_id=1)
+    genre.update(record_id=1, obj_in={'genre_name': 'Comedy'})
+    assert genre.get(record_id=1).genre_name == 'Comedy'
+    assert genre.cache.stats()['misses'] == 2
+
+
+def test_shared_record_cache(app_with_data):
+    """Checking that records are cached as JSON and invalidated in a shared backend"""
+    previous = genre.cache.backend
+    genre.cache.reset(SharedCache(LocalSharedClient(), ttl=60))
+    try:
+        first = genre.get(record_id=1)
+        assert genre.get(record_id=1) == first
+        genre.update(record_id=1, obj_in={'genre_name': 'Comedy'})
+        assert genre.get(record_id=1).genre_name == 'Comedy'
+        assert genre.cache.stats() == {'enabled': True, 'hits': 1, 'misses': 2}
+    finally:
+        genre.cache.reset(previous)
+
+
+def test_cache_stats(app_with_data):
+    """Checking the cache statistics endpoint"""
+    app_with_data.get(url_for("api.genre", genre_id=2))
+    app_with_data.get(url_for("api.genre", genre_id=2))
+    response = app_with_data.get(url_for("api.cache_stats"))
+    assert response.status_code == 200
+    assert response.json['records']['genre']['hits'] == 1
+    assert response.json['records']['film']['enabled'] is False
@@ -0,0 +1,99 @@
+"""Testing response cache"""
+
+from flask import url_for
+import pytest
+import redis
+
+from app.cache import LRUCache, SharedCache, LocalSharedClient, film_cache, shared_client
+from app.crud import film, genre
+
+
+@pytest.mark.parametrize("backend", [LRUCache(max_size=2, ttl=60),
+                                     SharedCache(LocalSharedClient(), ttl=60)])
+def test_backend(backend):
+    """Checking storing values and counters in cache backends"""
+    assert backend.get('key') is None
+    backend.set('key', ['body', {'X-Next-Cursor': 'abc'}])
+    assert backend.get('key') == ['body', {'X-Next-Cursor': 'abc'}]
+    assert backend.counter('version') == 0
+    assert backend.incr('version') == 1
+    assert backend.counter('version') == 1
+    assert backend.counter('missing') == 0
+
+
+def test_counter_read_not_stored():
+    """Checking that reading the versions of records does not create counters"""
+    cache = LRUCache(max_size=2, ttl=60)
+    genre.cache.backend, previous = cache, genre.cache.backend
+    try:
+        keys = [genre.record_key(record_id) for record_id in range(100)]
+        genre.invalidate_record(7)
+    finally:
+        genre.cache.backend = previous
+    assert keys[7].endswith(':0')
+    assert list(cache.counters) == ['genre:7:version']
+
+
+def test_shared_client():
+    """Checking that a configured url gets a redis client and no url the local stand-in"""
+    assert isinstance(shared_client(None), LocalSharedClient)
+    assert isinstance(shared_client('redis://localhost:6379/0'), redis.Redis)
+
+
+def test_lru_eviction():
+    """Checking eviction of the least recently used values"""
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set('first', 1)
+    cache.set('second', 2)
+    cache.get('first')
+    cache.set('third', 3)
+    assert cache.get('second') is None
+    assert cache.get('first') == 1
+    assert cache.get('third') == 3
+
+
+def test_lru_expiration():
+    """Checking that expired values are not returned"""
+    cache = LRUCache(max_size=2, ttl=-1)
+    cache.set('key', 1)
+    assert cache.get('key') is None
+
+
+def test_cached_response(app_with_data):
+    """Checking that a repeated request is served from the cache"""
+    first = app_with_data.get(url_for("api.films", page=1, per_page=2))
+    second = app_with_data.get(url_for("api.films", page=1, per_page=2))
+    assert first.json == second.json
+    assert film_cache.hits == 1
+    assert film_cache.misses == 1
+
+
+def test_cached_response_invalidation(app_with_data):
+    """Checking that film and genre changes invalidate cached responses"""
+    app_with_data.get(url_for("api.films", page=1, per_page=10))
+    film.update(record_id=1, obj_in={"rating": 1.5})
+    films = app_with_data.get(url_for("api.films", page=1, per_page=10)).json
+    assert films[0]['rating'] == 1.5
+
+    genre.remove(record_id=1)
+    films = app_with_data.get(url_for("api.films", page=1, per_page=10)).json
+    assert all(item['genre_name'] != 'Action' for record in films for item in record['genres'])
+    assert film_cache.hits == 0
+
+
+def test_cached_response_replica_lag(app_with_data):
+    """Checking that responses are not cached while replicas may lag behind a write"""
+    film_cache.replica_lag = 60
+    try:
+        film.update(record_id=1, obj_in={"rating": 1.5})
+        app_with_data.get(url_for("api.films", page=1, per_page=2))
+        app_with_data.get(url_for("api.films", page=1, per_page=2))
+        assert film_cache.hits == 0
+
+        film_cache.written = 0.0
+        film_cache.backend.set(f'{film_cache.name}:written', 0.0)
+        app_with_data.get(url_for("api.films", page=1, per_page=2))
+        app_with_data.get(url_for("api.films", page=1, per_page=2))
+        assert film_cache.hits == 1
+    finally:
+        film_cache.replica_lag = 0.0
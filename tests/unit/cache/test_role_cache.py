@@ -0,0 +1,18 @@
+"""Testing role cache"""
+
+from app import db
+from app.models import Role
+from app.principal import role_cache
+
+
+def test_role_cache(app_with_data):
+    """Checking that the roles are loaded once and reloaded after a role change"""
+    role_cache.invalidate()
+    assert role_cache.name(2) == 'admin'
+    names = role_cache.names
+    assert role_cache.name(1) == 'user'
+    assert role_cache.names is names
+
+    db.session.query(Role).get(1).name = 'viewer'
+    db.session.commit()
+    assert role_cache.name(1) == 'viewer'
@@ -91,3 +91,16 @@ def test_delete(app_with_data):
     assert db.session.query(User).get(5) is None
     assert isinstance(del_user, UserBase)
     assert after == before - 1
+
+
+@pytest.mark.parametrize("ids, found, missing", [
+    ([3, 1, 2], [3, 1, 2], []),
+    ([5, 100, 5, 1], [5, 1], [100]),
+    ([], [], [])
+])
+def test_get_many(app_with_data, ids, found, missing):
+    """Checking that records are returned in the order of the ids with missing ids"""
+    users, missing_ids = user.get_many(ids)
+    assert users.dict()['__root__'] == \
+        [UserBase.from_orm(db.session.query(User).get(user_id)).dict() for user_id in found]
+    assert missing_ids == missing
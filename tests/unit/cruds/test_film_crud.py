@@ -2,12 +2,15 @@
 
 from pydantic import ValidationError
 import pytest
+from werkzeug.exceptions import NotFound
 
 
 from app import db
 from app.crud import film
-from app.models import Film
+from app.crud.base import MissingRecordsError
+from app.models import Director, Film
 from app.schemas import FilmBase
+from tests.conftest import count_statements
 
 
 @pytest.mark.parametrize(
@@ -121,6 +124,14 @@ def test_date_filter(app_with_data, date_range, count):
     assert len(films) == count
 
 
+@pytest.mark.parametrize(
+    "date_range", ["2009-2001", "2001", "01-2009", "2001-2009-2010", "abcd-2009"])
+def test_date_filter_invalid(app_with_data, date_range):
+    """Check validation of the release years range"""
+    with pytest.raises(ValueError):
+        film.date_filter(db.session.query(Film), date_range)
+
+
 @pytest.mark.parametrize(
     "directors, count",
     [("John_Johnson", 2), ("Jack_Jackson", 3), ("John_Johnson&Jack_Jackson", 4)])
@@ -131,6 +142,24 @@ def test_director_filter(app_with_data, directors, count):
     assert len(films) == count
 
 
+@pytest.mark.parametrize("directors, count", [("John", 0), ("John_Johnson&Jack", 2)])
+def test_director_filter_unmatched(app_with_data, directors, count):
+    """Checking that values without a surname part match no directors"""
+    films = film.director_filter(db.session.query(Film).distinct(), directors).all()
+    assert len(films) == count
+
+
+def test_director_filter_underscore(app_with_data):
+    """Checking that names containing underscores match name and surname joined with '_'"""
+    director = Director(name="Mary", surname="Van_Dyke")
+    db.session.query(Film).get(1).directors.append(director)
+    db.session.commit()
+    for directors in ("Mary_Van_Dyke", "Mary_Van&Mary_Van_Dyke"):
+        films = film.director_filter(db.session.query(Film).distinct(), directors).all()
+        assert [record.film_id for record in films] == [1]
+    assert not film.director_filter(db.session.query(Film), "Mary_Van").all()
+
+
 @pytest.mark.parametrize(
     "genres, count",
     [('Action', 3), ('Drama', 2), ('Fantasy', 2),
@@ -192,3 +221,318 @@ def test_multy_sort(app_with_data, data, postgres_query):
     alchemy = film.query_film_multy_sort(order=data).dict()["__root__"]
     db_query = db.session.execute(postgres_query).all()
     assert [alchemy[i]['title'] == db_query[i][1] for i in range(len(alchemy))]
+
+
+@pytest.mark.parametrize("strategy", ['selectin', 'joined'])
+def test_get_multi_statement_count(app_with_data, strategy):
+    """Checking that the number of statements per page does not depend on per_page"""
+    film.load_strategy = strategy
+    counts = []
+    try:
+        for per_page in (1, 2, 5):
+            db.session.expire_all()
+            with count_statements() as statements:
+                films = film.get_multi(per_page=per_page).dict()['__root__']
+            assert len(films) == per_page
+            counts.append(len(statements))
+    finally:
+        film.load_strategy = 'selectin'
+    assert len(set(counts)) == 1
+
+
+@pytest.mark.parametrize("page, per_page, count", [(1, 2, 2), (3, 2, 1), (1, 10, 5), (1, 0, 0)])
+def test_query_paginate_no_count(app_with_data, page, per_page, count):
+    """Checking that the pagination returns the page without counting all the records"""
+    with count_statements() as statements:
+        films = film.query_paginate(db.session.query(Film).order_by(Film.film_id),
+                                    page=page, per_page=per_page)
+    assert len(films) == count
+    assert len(statements) == 1
+    assert 'count(' not in statements[0].lower()
+
+
+@pytest.mark.parametrize("page, per_page", [(0, 2), (4, 2), (2, 0), (1, -1)])
+def test_query_paginate_not_found(app_with_data, page, per_page):
+    """Checking the not found error for pages out of range"""
+    with pytest.raises(NotFound):
+        film.query_paginate(db.session.query(Film), page=page, per_page=per_page)
+
+
+def test_count(app_with_data):
+    """Checking the cached total of the film table"""
+    film.cache.counts.clear()
+    assert film.count() == 5
+    db.session.delete(db.session.query(Film).get(5))
+    db.session.commit()
+    assert film.count() == 5
+    film.cache.counts.clear()
+    assert film.count() == 4
+    assert film.count(approximate=True) >= 0
+
+
+def film_values(title):
+    """Function returning valid values of a new film"""
+    return {
+        "title": title,
+        "poster": "https://www.posters.net/Peaky-Blinders-poster",
+        "description": "A gangster family epic set in 1900s England.",
+        "release_date": "2013-09-12",
+        "rating": 9.5,
+        "user_id": 4
+    }
+
+
+def test_resolve_relations_statement_count(app_with_data):
+    """Checking that directors and genres are fetched with one query per table"""
+    with count_statements() as statements:
+        relations = film.resolve_relations(directors_id=['1', '2', '3', '4', '2'],
+                                           genres_id=['1', '2', '3'])
+    assert len(statements) == 2
+    assert [item.director_id for item in relations['directors']] == [1, 2, 3, 4]
+    assert [item.genre_id for item in relations['genres']] == [1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "directors, genres",
+    [(['1', '100'], ['1']), (['1'], ['2', '50', '60']), (['1', 'x'], ['1'])])
+def test_create_film_missing_relations(app_with_data, directors, genres):
+    """Checking that a film referencing missing directors or genres is not created"""
+    count = len(db.session.query(Film).all())
+    with pytest.raises(MissingRecordsError):
+        film.create(obj_in=film_values("Ronny"), directors=directors, genres=genres)
+    db.session.commit()
+    assert len(db.session.query(Film).all()) == count
+
+
+def test_resolve_ids_normalised(app_with_data):
+    """Checking that ids written differently resolve to the same record once"""
+    records = film.resolve_ids(Director, ['01', ' 1', 1, '2'])
+    assert [record.director_id for record in records] == [1, 2]
+
+
+def test_update_film_relations(app_with_data):
+    """Checking the replacement of film directors and genres on update"""
+    updated = film.update(record_id=5, obj_in={"rating": 5.5},
+                          directors=['1', '2'], genres=['4'])
+    assert len(updated.directors) == 2
+    assert [item.genre_name for item in updated.genres] == ['Horror']
+    assert db.session.query(Film).get(5).rating == 5.5
+
+
+@pytest.mark.parametrize(
+    "title, expected",
+    [("in", ["Winner", "Evening in Manhattan"]),
+     ("Mar", ["Mary Johnson", "Mark per million"])])
+def test_get_multy_by_title_relevance_fallback(app_with_data, title, expected):
+    """Checking the relevance order of the search without the pg_trgm extension"""
+    trigram = film.trigram
+    film.trigram = False
+    try:
+        films = film.get_multi_by_title(title=title, relevance=True).dict()['__root__']
+    finally:
+        film.trigram = trigram
+    assert [item['title'] for item in films] == expected
+
+
+def test_get_multy_by_title_relevance(app_with_data):
+    """Checking that the relevance order returns the same films as the default one"""
+    by_id = film.get_multi_by_title(title="o").dict()['__root__']
+    by_relevance = film.get_multi_by_title(title="o", relevance=True).dict()['__root__']
+    assert sorted(item['title'] for item in by_id) == \
+        sorted(item['title'] for item in by_relevance)
+
+
+def explain(query):
+    """Function returning the PostgreSQL plan of a query with sequential scans disabled"""
+    with count_statements(parameters=True) as executed:
+        query.all()
+
+    statement, parameters = executed[0]
+    connection = db.session.connection()
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    return '\n'.join(row[0] for row in
+                     connection.exec_driver_sql(f"EXPLAIN {statement}", parameters))
+
+
+@pytest.mark.parametrize(
+    "build_query, index",
+    [(lambda: film.date_asc(db.session.query(Film)).limit(10), 'ix_film_release_date'),
+     (lambda: film.rating_desc(db.session.query(Film)).limit(10), 'ix_film_rating'),
+     (lambda: film.genre_filter(db.session.query(Film).distinct(), 'Action&Drama'),
+      'ix_film_genre_genre_id_film_id'),
+     (lambda: film.director_filter(db.session.query(Film).distinct(), 'John_Johnson'),
+      'ix_film_director_director_id_film_id'),
+     (lambda: film.director_filter(db.session.query(Film).distinct(),
+                                   'John_Johnson&Jack_Jackson'), 'ix_director_name_surname'),
+     (lambda: film.date_filter(db.session.query(Film), '2001-2009'), 'ix_film_release_date')])
+def test_filter_sort_indexes(app_with_data, build_query, index):
+    """Checking that the sort and filter queries are planned with the indexes"""
+    assert index in explain(build_query())
+
+
+@pytest.mark.parametrize("strategy", ['select', 'selectin', 'joined'])
+def test_get_multi_projection(app_with_data, strategy):
+    """Checking that film lists do not load the columns missing in the schema"""
+    film.load_strategy = strategy
+    try:
+        db.session.expire_all()
+        with count_statements() as statements:
+            films = film.get_multi().dict()['__root__']
+    finally:
+        film.load_strategy = 'selectin'
+    assert [record['title'] for record in films] == \
+        [record.title for record in db.session.query(Film).order_by(Film.film_id).limit(10)]
+    assert all('film.description' not in statement for statement in statements)
+
+
+def sorted_relationships(films):
+    """Function sorting directors and genres of the serialised films"""
+    for record in films:
+        record['directors'] = sorted(record['directors'], key=lambda item: tuple(item.values()))
+        record['genres'] = sorted(record['genres'], key=lambda item: item['genre_name'])
+    return films
+
+
+@pytest.mark.parametrize(
+    "read",
+    [
+        lambda: film.get_multi(per_page=3),
+        lambda: film.get_multi_by_title(title="o", relevance=True),
+        lambda: film.query_film_multy_filter(values=[None, None, "Action&Comedy"]),
+        lambda: film.query_film_multy_sort(order=["desc", None]),
+        lambda: film.get_multi_keyset(per_page=2)[0],
+        lambda: film.query_film_multy_sort_keyset(order=[None, "asc"], per_page=4)[0]
+    ])
+def test_aggregate_mode(app_with_data, read):
+    """Checking that the aggregate mode returns the same films with one statement"""
+    expected = sorted_relationships(read().dict()['__root__'])
+    film.list_mode = 'aggregate'
+    try:
+        with count_statements() as statements:
+            films = read().dict()['__root__']
+    finally:
+        film.list_mode = 'orm'
+    assert sorted_relationships(films) == expected
+    assert len([statement for statement in statements
+                if 'pg_extension' not in statement]) == 1
+    assert 'jsonb_agg' in statements[-1]
+
+
+def test_aggregate_mode_cursor(app_with_data):
+    """Checking that the aggregate mode continues the pages from the cursor"""
+    film.list_mode = 'aggregate'
+    try:
+        first, cursor = film.get_multi_keyset(per_page=3)
+        second, _ = film.get_multi_keyset(cursor=cursor, per_page=3)
+    finally:
+        film.list_mode = 'orm'
+    titles = [record.title for record in first.__root__ + second.__root__]
+    assert titles == [record.title for record in
+                      db.session.query(Film).order_by(Film.film_id).limit(6)]
+
+
+def test_bulk_create(app_with_data):
+    """Checking that a batch is saved with per-row errors and without per-row queries"""
+    rows = [
+        film_values("Bulk one") | {"directors": "1&2", "genres": [3]},
+        film_values("bulk two"),
+        film_values("Winner"),
+        film_values("Bulk three") | {"directors": "1&100"},
+        film_values("Bulk one"),
+        film_values("Bulk four") | {"genres": "x"},
+        film_values("Bulk five") | {"description": ""}
+    ]
+    with count_statements() as statements:
+        errors = film.bulk_create(rows, user_id=4)
+    assert sorted(errors) == [1, 2, 3, 4, 5]
+    assert "already exist" in errors[2] and "100" in errors[3] and "repeated" in errors[4]
+    assert len(statements) <= 8
+
+    created = db.session.query(Film).filter(Film.title.in_(["Bulk one", "Bulk five"])).all()
+    assert len(created) == 2
+    bulk_one = next(record for record in created if record.title == "Bulk one")
+    assert sorted(record.director_id for record in bulk_one.directors) == [1, 2]
+    assert [record.genre_id for record in bulk_one.genres] == [3]
+    bulk_five = next(record for record in created if record.title == "Bulk five")
+    assert bulk_five.description == "Film has no description."
+
+
+def test_export_batches(app_with_data):
+    """Checking that films are exported in batches of the given size"""
+    batches = list(film.export_batches(batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [record["title"] for batch in batches for record in batch] == \
+        [record.title for record in db.session.query(Film).order_by(Film.film_id)]
+
+
+@pytest.mark.parametrize("list_mode", ['orm', 'aggregate'])
+def test_get_many_statement_count(app_with_data, list_mode):
+    """Checking that films are read by ids with a constant number of statements"""
+    film.list_mode = list_mode
+    try:
+        db.session.expire_all()
+        with count_statements() as statements:
+            films, missing = film.get_many([4, 2, 42])
+    finally:
+        film.list_mode = 'orm'
+    assert [record.title for record in films.__root__] == \
+        [db.session.query(Film).get(film_id).title for film_id in (4, 2)]
+    assert missing == [42]
+    assert len(statements) == (1 if list_mode == 'aggregate' else 3)
+
+
+def test_bulk_update(app_with_data):
+    """Checking that a batch is updated with per-item statuses and without per-item queries"""
+    items = [
+        {"film_id": 1, "rating": 5.5, "genres": "4&5"},
+        {"film_id": 2, "title": "Winner"},
+        {"film_id": 3, "poster": "poster"},
+        {"film_id": 4, "directors": [1, 100]},
+        {"film_id": 42, "rating": 1},
+        {"film_id": 1, "rating": 2},
+        {"rating": 3},
+        {"film_id": 5, "title": "Final winner"}
+    ]
+    with count_statements() as statements:
+        results = film.bulk_update(items, user_id=6)
+    assert [result["status"] for result in results] == \
+        ["updated", "invalid", "invalid", "invalid", "not_found", "invalid", "invalid", "updated"]
+    assert "already exist" in results[1]["error"] and "100" in results[3]["error"]
+    assert len(statements) <= 12
+
+    db.session.expire_all()
+    record = db.session.query(Film).get(1)
+    assert record.rating == 5.5
+    assert sorted(genre.genre_id for genre in record.genres) == [4, 5]
+    assert db.session.query(Film).get(5).title == "Final winner"
+    assert db.session.query(Film).get(2).title == "On the other side"
+
+
+@pytest.mark.parametrize("user_id, admin, status", [(4, False, "forbidden"), (4, True, "updated")])
+def test_bulk_update_access(app_with_data, user_id, admin, status):
+    """Checking that only the owner or an administrator can update films in a batch"""
+    results = film.bulk_update([{"film_id": 1, "rating": 1.5}], user_id=user_id, admin=admin)
+    assert results == [{"film_id": 1, "status": status}]
+    db.session.expire_all()
+    assert (db.session.query(Film).get(1).rating == 1.5) == (status == "updated")
+
+
+def test_bulk_update_access_first(app_with_data):
+    """Checking that missing and foreign films are reported before their items are validated"""
+    results = film.bulk_update([{"film_id": 2, "poster": "poster"},
+                                {"film_id": 42, "rating": "high"}], user_id=4)
+    assert [result["status"] for result in results] == ["forbidden", "not_found"]
+
+
+def test_bulk_remove(app_with_data):
+    """Checking that a batch of films and their links is deleted with a constant number
+    of statements"""
+    with count_statements() as statements:
+        results = film.bulk_remove([1, 42, 1, 3], user_id=6)
+    assert results == [{"film_id": 1, "status": "deleted"},
+                       {"film_id": 42, "status": "not_found"},
+                       {"film_id": 3, "status": "deleted"}]
+    assert len(statements) <= 5
+    assert [record.film_id for record in db.session.query(Film).order_by(Film.film_id)] == \
+        [2, 4, 5]
+    assert film.bulk_remove([2], user_id=4) == [{"film_id": 2, "status": "forbidden"}]
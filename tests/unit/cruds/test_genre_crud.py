@@ -5,6 +5,7 @@ from faker import Faker
 from app import db
 from app.crud import genre
 from app.models import Film, Genre
+from tests.conftest import count_statements
 
 
 def test_delete(app_with_data):
@@ -31,3 +32,12 @@ def test_delete(app_with_data):
 
     for film in db.session.query(Film).filter(Film.film_id > count).all():
         assert film.genres == []
+
+
+def test_delete_no_film_scan(app_with_data):
+    """Checking that the deletion does not read the whole film table"""
+    with count_statements() as statements:
+        genre.remove(record_id=2)
+
+    assert any(statement.startswith('DELETE FROM film_genre') for statement in statements)
+    assert all('film_genre' in statement for statement in statements if 'FROM film' in statement)
@@ -0,0 +1,37 @@
+"""Testing database connection pool"""
+
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app import db
+from app.models import Film
+from app.pool import MeteredQueuePool
+
+
+def test_engine_pool(app_with_data):
+    """Checking that the engine pool is configured from the app config and counts checkouts"""
+    pool = db.engine.pool
+    assert isinstance(pool, MeteredQueuePool)
+    assert pool.size() == 5 and pool._pre_ping is True
+
+    db.session.commit()
+    before = pool.stats()['checkouts']
+    db.session.query(Film).all()
+    db.session.commit()
+    assert pool.stats()['checkouts'] == before + 1
+    assert pool.stats()['checked_out'] == 0
+
+
+def test_pool_timeouts():
+    """Checking that checkouts of an exhausted pool are counted as timeouts"""
+    pool = MeteredQueuePool(lambda: sqlite3.connect(':memory:'), pool_size=1,
+                            max_overflow=0, timeout=0.01)
+    connection = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    connection.close()
+    stats = pool.stats()
+    assert stats['checkouts'] == 1 and stats['timeouts'] == 1
+    assert stats['max_wait'] >= stats['average_wait'] >= 0
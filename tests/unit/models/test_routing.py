@@ -0,0 +1,50 @@
+"""Testing routing of the reads to the database replicas"""
+
+from flask import current_app, session
+import pytest
+
+from app import db
+from app.crud import film, genre
+from app.models.routing import PRIMARY_UNTIL_KEY
+from tests.conftest import count_statements
+
+
+@pytest.fixture(name="replica")
+def replica_fixture(app_with_data):
+    """Fixture with the test database added as a replica, yields the replica statements"""
+    current_app.config['SQLALCHEMY_BINDS'] = {
+        'replica_0': current_app.config['SQLALCHEMY_DATABASE_URI']}
+    db.session.remove()
+    session.pop(PRIMARY_UNTIL_KEY, None)
+    engine = db.get_engine(bind='replica_0')
+    with count_statements(engine) as statements:
+        yield statements
+    db.session.remove()
+    current_app.config['SQLALCHEMY_BINDS'] = {}
+    engine.dispose()
+
+
+def test_replica_reads(replica):
+    """Checking that list reads go to the replica and single record reads do not"""
+    films = film.get_multi(per_page=2).dict()['__root__']
+    assert len(films) == 2
+    assert replica and all(statement.lstrip().upper().startswith('SELECT')
+                           for statement in replica)
+
+    replica.clear()
+    film.get(record_id=1)
+    assert not replica
+
+
+def test_replica_read_your_writes(replica):
+    """Checking that the reads after a write of the session go to the primary database"""
+    genre.update(record_id=1, obj_in={'genre_name': 'Comedy'})
+    genres = genre.get_multi(per_page=8).dict()['__root__']
+    assert genres[0]['genre_name'] == 'Comedy'
+    assert not replica
+
+
+def test_no_replicas(app_with_data):
+    """Checking that without replicas the reads go to the primary database"""
+    assert db.session().replica_binds() == []
+    assert len(film.get_multi(per_page=2).dict()['__root__']) == 2
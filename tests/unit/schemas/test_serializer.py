@@ -0,0 +1,31 @@
+"""Testing the trusted row serializer"""
+
+import pytest
+
+from app.models import Director, Film, Genre, User
+from app.schemas import DirectorBase, DirectorList, FilmBase, FilmList, GenreBase, GenreList, \
+    UserBase, UserList
+from app.schemas.serializer import serialize_rows
+
+
+@pytest.mark.parametrize(
+    "model, schema, list_schema",
+    [
+        (Film, FilmBase, FilmList),
+        (Genre, GenreBase, GenreList),
+        (Director, DirectorBase, DirectorList),
+        (User, UserBase, UserList)
+    ])
+def test_serialize_rows(app_with_data, model, schema, list_schema):
+    """Checking that trusted rows are serialised the same way as validated ones"""
+    rows = model.query.all()
+    trusted = serialize_rows(list_schema, schema, rows)
+    assert all(isinstance(record, schema) for record in trusted.__root__)
+    assert trusted.dict() == list_schema.from_orm([schema.from_orm(row) for row in rows]).dict()
+
+
+def test_serialize_rows_no_validation():
+    """Checking that validators are not run for trusted rows"""
+    row = Genre(genre_name='not validated 1')
+    assert serialize_rows(GenreList, GenreBase, [row]).dict() == \
+        {'__root__': [{'genre_name': 'not validated 1'}]}